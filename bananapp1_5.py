@@ -1,116 +1,3453 @@
+import time
+# Marca o início do processo para o benchmark de inicialização (--benchmark-startup)
+STARTUP_TIME = time.perf_counter()
 import sys
 import os
-import pandas as pd
 import json
-import yaml
-import sqlite3
-import xml.etree.ElementTree as ET
 import io
+import importlib
+import importlib.util
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from collections import OrderedDict
 from PySide6.QtWidgets import (QApplication, QMainWindow, QTableView, QVBoxLayout, 
                                 QHBoxLayout, QWidget, QPushButton, QFileDialog, 
                                 QLineEdit, QLabel, QMessageBox, QHeaderView, QComboBox,
-                                QStatusBar,QProgressBar, QDialog, QCheckBox, QFormLayout)
-from PySide6.QtCore import Qt, QSortFilterProxyModel, QModelIndex, QAbstractTableModel, Signal
+                                QStatusBar,QProgressBar, QDialog, QCheckBox, QFormLayout,
+                                QListWidget, QListWidgetItem, QSpinBox, QInputDialog)
+from PySide6.QtCore import Qt, QModelIndex, QAbstractTableModel, Signal
 from PySide6.QtGui import QAction, QIcon, QColor, QPalette, QFont,QIntValidator
-from PySide6.QtCore import Qt, QSortFilterProxyModel, QModelIndex, QAbstractTableModel, Signal, QTimer
-try:
-    import bson
-    BSON_AVAILABLE = True
-except ImportError:
-    BSON_AVAILABLE = False
-try:
-    import openpyxl
-    EXCEL_AVAILABLE = True
-except ImportError:
-    EXCEL_AVAILABLE = False
-
-# Adicionar após as importações existentes
-try:
-    import psycopg2
-    POSTGRES_AVAILABLE = True
-except ImportError:
-    POSTGRES_AVAILABLE = False
-
-try:
-    import mysql.connector
-    MYSQL_AVAILABLE = True
-except ImportError:
-    MYSQL_AVAILABLE = False
-
-"""try:
-    import pymssql
-    MSSQL_AVAILABLE = True
-except ImportError:
-    MSSQL_AVAILABLE = False"""
-
-try:
-    import sqlalchemy
-    SQLALCHEMY_AVAILABLE = True
-except ImportError:
-    SQLALCHEMY_AVAILABLE = False
+from PySide6.QtCore import Qt, QModelIndex, QAbstractTableModel, Signal, QTimer, QObject, QThread, QAbstractProxyModel
+from shiboken6 import isValid
+
+class LazyModule:
+    # Importa o módulo só no primeiro acesso a um atributo, para a janela abrir
+    # sem pagar o custo do pandas e das bibliotecas opcionais
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+pd = LazyModule("pandas")
+np = LazyModule("numpy")
+
+@lru_cache(maxsize=None)
+def module_available(name):
+    # Verifica se a biblioteca está instalada sem importá-la
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+# Cache de exibição: as células são formatadas em blocos de linhas por coluna
+DISPLAY_BLOCK_ROWS = 256
+DISPLAY_CACHE_BLOCKS = 2048
 
 class PandasModel(QAbstractTableModel):
     dataChanged = Signal(QModelIndex, QModelIndex)
+    # Só edições do usuário (setData); dataChanged também repinta blocos recém-lidos
+    edited = Signal(QModelIndex, QModelIndex)
     
     def __init__(self, data):
         super().__init__()
         self._data = data
+        # (coluna, bloco) -> lista de strings já formatadas, em ordem LRU
+        self._display_cache = OrderedDict()
+        
+    def _display_block(self, col, block):
+        key = (col, block)
+        cached = self._display_cache.get(key)
+        if cached is not None:
+            self._display_cache.move_to_end(key)
+            return cached
+            
+        # Formata o bloco inteiro de uma vez; str() em cada objeto, pois o astype(str)
+        # do NumPy alocaria a largura da célula mais longa para todas as linhas
+        start = block * DISPLAY_BLOCK_ROWS
+        values = self._data.iloc[start:start + DISPLAY_BLOCK_ROWS, col].to_numpy(dtype=object)
+        cached = list(map(str, values))
+        
+        self._display_cache[key] = cached
+        if len(self._display_cache) > DISPLAY_CACHE_BLOCKS:
+            self._display_cache.popitem(last=False)
+        return cached
+        
+    def rowCount(self, parent=QModelIndex()):
+        return len(self._data.index)
+        
+    def columnCount(self, parent=QModelIndex()):
+        return len(self._data.columns)
+        
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+            
+        if role == Qt.DisplayRole or role == Qt.EditRole:
+            row = index.row()
+            block = self._display_block(index.column(), row // DISPLAY_BLOCK_ROWS)
+            return block[row % DISPLAY_BLOCK_ROWS]
+            
+        if role == Qt.BackgroundRole:
+            return QColor(45, 45, 45)
+            
+        if role == Qt.ForegroundRole:
+            return QColor(200, 200, 200)
+            
+        return None
+        
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole:
+            if orientation == Qt.Horizontal:
+                return str(self._data.columns[section])
+            else:
+                return str(self._data.index[section])
+        return None
+        
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+            
+        row = index.row()
+        col = index.column()
+        column_name = self._data.columns[col]
+        
+        try:
+            # Try to convert to original dtype if possible
+            orig_dtype = self._data[column_name].dtype
+            converted_value = pd.Series([value], dtype=orig_dtype)[0]
+            self._data.iloc[row, col] = converted_value
+        except:
+            # If conversion fails, use string value
+            self._data.iloc[row, col] = value
+            
+        # Atualiza apenas a célula editada no cache de exibição
+        cached = self._display_cache.get((col, row // DISPLAY_BLOCK_ROWS))
+        if cached is not None:
+            cached[row % DISPLAY_BLOCK_ROWS] = str(self._data.iloc[row, col])
+            
+        self.dataChanged.emit(index, index)
+        self.edited.emit(index, index)
+        return True
+        
+    def flags(self, index):
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
+        
+    def get_dataframe(self):
+        return self._data
+        
+    def append_rows(self, df):
+        # Acrescenta um lote ao final (leitura em fluxo), sem recriar o modelo
+        if len(df) == 0:
+            return
+        start = len(self._data.index)
+        self.beginInsertRows(QModelIndex(), start, start + len(df) - 1)
+        self._data = pd.concat([self._data, df], ignore_index=True)
+        first_block = start // DISPLAY_BLOCK_ROWS
+        for key in [key for key in self._display_cache if key[1] >= first_block]:
+            del self._display_cache[key]
+        self.endInsertRows()
+
+# Arquivos maiores que isto são abertos em modo janela (lidos do disco por blocos)
+LARGE_FILE_THRESHOLD = 256 * 1024 * 1024
+WINDOW_BLOCK_ROWS = 4096
+WINDOW_CACHE_BLOCKS = 24
+WINDOW_PREFETCH_BLOCKS = 1
+
+# Linhas por bloco na leitura de CSV em memória
+CSV_CHUNK_ROWS = 100000
+
+# Registros por lote na leitura em fluxo de JSON; arrays acima do limite são lidos em fluxo
+JSON_BATCH_ROWS = 10000
+JSON_STREAM_THRESHOLD = 64 * 1024 * 1024
+
+# Itens por lote na leitura e na escrita em fluxo de YAML
+YAML_BATCH_ROWS = 5000
+
+# Documentos por lote na leitura e na escrita de BSON
+BSON_BATCH_ROWS = 10000
+
+# Linhas por página lidas de tabelas SQLite
+SQLITE_PAGE_ROWS = 2000
+# Linhas por executemany ao exportar para SQLite
+SQLITE_WRITE_ROWS = 50000
+
+# Linhas por fetchmany na leitura de bancos SQL remotos
+SQL_FETCH_ROWS = 5000
+# Linhas por página de tabelas SQL remotas paginadas pela chave primária
+SQL_PAGE_ROWS = 1000
+# Gravação em massa: linhas por bloco enviado (COPY / INSERT) e linhas por INSERT multi-linha
+SQL_COPY_ROWS = 50000
+SQL_INSERT_BATCH_ROWS = 1000
+# Sufixos das tabelas temporárias usadas ao substituir uma tabela (carga nova e antiga)
+SQL_STAGING_SUFFIX = "__carga"
+SQL_REPLACED_SUFFIX = "__antiga"
+
+# Pool de conexões SQL por perfil: tamanho máximo, tempo ocioso até fechar,
+# ociosidade a partir da qual a conexão é testada antes do uso e espera por uma livre
+SQL_POOL_MAX_SIZE = 4
+SQL_POOL_IDLE_SECONDS = 300
+SQL_POOL_PING_SECONDS = 30
+SQL_POOL_TIMEOUT_SECONDS = 30
+# Intervalo da limpeza periódica das conexões ociosas
+SQL_POOL_SWEEP_MS = 60 * 1000
+
+# Linhas por lote na leitura (somente leitura) e na escrita (somente escrita) do Excel
+EXCEL_BATCH_ROWS = 10000
+EXCEL_MAX_ROWS = 1048576
+
+# Espera após a última tecla antes de filtrar; linhas convertidas para texto por vez
+FILTER_DEBOUNCE_MS = 250
+FILTER_CHUNK_ROWS = 50000
+# Consultas recentes com o resultado guardado
+FILTER_CACHE_QUERIES = 16
+# Ordenações recentes (permutações das linhas) guardadas no proxy
+SORT_CACHE_ORDERS = 4
+# Índice de trigramas da busca: colunas com texto médio acima do limite não são
+# indexadas, células acima de INDEX_MAX_LENGTH são sempre conferidas
+INDEX_MAX_MEAN_LENGTH = 64
+INDEX_MAX_LENGTH = 256
+INDEX_CHUNK_ROWS = 20000
+INDEX_VERIFY_ROWS = 2000
+INDEX_MAX_FRACTION = 0.25
+INDEX_SUFFIX = ".bananaidx"
+
+# Registros por lote na leitura e na escrita em fluxo de XML
+XML_BATCH_ROWS = 10000
+
+class CsvBlockSource:
+    # Índice de deslocamentos (em bytes) do início de cada bloco de linhas de um CSV
+    keyed = False
+    
+    def __init__(self, file_name, block_rows=WINDOW_BLOCK_ROWS, encoding='utf-8', progress=None):
+        self.file_name = file_name
+        self.block_rows = block_rows
+        self.encoding = encoding
+        self.columns = list(pd.read_csv(file_name, nrows=0, encoding=encoding).columns)
+        self._build_index(progress)
+        # Tipos do primeiro bloco valem para todos; inferidos por bloco, a mesma coluna
+        # apareceria como 1 num bloco e 4.0 em outro (bloco com ausentes)
+        self._dtypes = None
+        if self.offsets:
+            self._dtypes = csv_block_dtypes(self.read_block(0).dtypes)
+        
+    def _build_index(self, progress=None, chunk_size=16 * 1024 * 1024):
+        # Linhas em branco ficam fora da contagem, como na leitura do pandas
+        offsets = []
+        records = 0  # registros completos vistos, incluindo o cabeçalho
+        quotes = 0
+        pos = 0
+        last_end = 0  # fim do último registro (início do próximo)
+        last_byte = b''
+        size = os.path.getsize(self.file_name)
+        with open(self.file_name, 'rb') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                buf = np.frombuffer(chunk, dtype=np.uint8)
+                quote_pos = np.flatnonzero(buf == 34)
+                newlines = np.flatnonzero(buf == 10)
+                # Quebras de linha dentro de aspas não terminam o registro
+                quotes_before = np.searchsorted(quote_pos, newlines) + quotes
+                record_newlines = newlines[quotes_before % 2 == 0]
+                ends = record_newlines + pos + 1
+                # Registro em branco: só "\n" ou "\r\n"
+                lengths = np.diff(ends, prepend=last_end)
+                before = buf[np.maximum(record_newlines - 1, 0)].astype(np.int16)
+                if len(record_newlines) and record_newlines[0] == 0:
+                    before[0] = last_byte[0] if last_byte else -1
+                blank = (lengths == 1) | ((lengths == 2) & (before == 13))
+                if len(ends):
+                    last_end = int(ends[-1])
+                ends = ends[~blank]
+                # O registro n (n >= 1) começa logo após o fim do registro n - 1
+                numbers = np.arange(records, records + len(ends))
+                offsets.extend(ends[numbers % self.block_rows == 0].tolist())
+                records += len(ends)
+                quotes += len(quote_pos)
+                pos += len(chunk)
+                last_byte = chunk[-1:]
+                if progress:
+                    progress(pos, size)
+        if pos > last_end and not (pos - last_end == 1 and last_byte == b'\r'):
+            records += 1  # última linha sem quebra de linha no final
+        self.row_count = max(records - 1, 0)
+        block_count = -(-self.row_count // self.block_rows)
+        self.offsets = offsets[:block_count]
+        
+    @property
+    def block_count(self):
+        return len(self.offsets)
+        
+    def locate(self, row):
+        return row // self.block_rows, row % self.block_rows
+        
+    def block_start(self, block):
+        return block * self.block_rows
+        
+    def read_block(self, block):
+        # Os tipos vão para o próprio read_csv: converter depois com astype mudaria os
+        # dados (ausente virando True, "007" virando "7.0")
+        try:
+            return self._read_block(block, self._dtypes)
+        except (TypeError, ValueError):
+            # Valores de outro tipo no bloco (ex.: texto numa coluna numérica): lê como texto
+            return self._read_block(block, str)
+            
+    def _read_block(self, block, dtype):
+        with open(self.file_name, 'rb') as f:
+            f.seek(self.offsets[block])
+            return pd.read_csv(f, header=None, names=self.columns, nrows=self.block_rows,
+                               encoding=self.encoding, dtype=dtype)
+            
+    def iter_frames(self):
+        for block in range(self.block_count):
+            yield self.read_block(block)
+
+def csv_block_dtypes(dtypes):
+    # Tipos do primeiro bloco em versões que aceitam ausentes nos blocos seguintes
+    result = {}
+    for column, dtype in dtypes.items():
+        if dtype.kind == 'b':
+            result[column] = 'boolean'
+        elif dtype.kind in 'iu':
+            result[column] = 'Int64'
+        elif dtype.kind == 'f':
+            result[column] = dtype
+        else:
+            result[column] = str
+    return result
+
+class ParquetBlockSource:
+    # Cada row group do Parquet é um bloco
+    keyed = False
+    
+    def __init__(self, file_name, progress=None):
+        import pyarrow.parquet as pq
+        self.file_name = file_name
+        self._file = pq.ParquetFile(file_name)
+        self.columns = list(self._file.schema_arrow.names)
+        metadata = self._file.metadata
+        sizes = [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+        self._starts = np.concatenate([[0], np.cumsum(sizes, dtype=np.int64)])
+        self.row_count = int(self._starts[-1])
+        
+    @property
+    def block_count(self):
+        return len(self._starts) - 1
+        
+    def locate(self, row):
+        block = int(np.searchsorted(self._starts, row, side='right')) - 1
+        return block, row - int(self._starts[block])
+        
+    def block_start(self, block):
+        return int(self._starts[block])
+        
+    def read_block(self, block):
+        return self._file.read_row_group(block).to_pandas()
+        
+    def iter_frames(self):
+        # Leitor próprio: a varredura roda em outra thread enquanto a vista lê blocos
+        import pyarrow.parquet as pq
+        reader = pq.ParquetFile(self.file_name)
+        for block in range(reader.metadata.num_row_groups):
+            yield reader.read_row_group(block).to_pandas()
+
+class WindowedTableModel(QAbstractTableModel):
+    dataChanged = Signal(QModelIndex, QModelIndex)
+    # Só edições do usuário (setData); a chegada de um bloco emite apenas dataChanged
+    edited = Signal(QModelIndex, QModelIndex)
+    fetch_failed = Signal(str)
+    
+    def __init__(self, source, cache_blocks=WINDOW_CACHE_BLOCKS):
+        super().__init__()
+        self._source = source
+        self._cache_blocks = cache_blocks
+        # bloco -> DataFrame, em ordem LRU; só a janela visível fica em memória
+        self._blocks = OrderedDict()
+        # (chave da linha, coluna) -> valor editado, aplicado por cima dos blocos do
+        # disco; a chave é o índice do bloco (rowid) em fontes com chave, senão a posição
+        self._edits = {}
+        # Blocos são lidos em segundo plano (disco ou servidor), um por vez: os pedidos
+        # pela vista, o mais recente primeiro, antes dos antecipados
+        self._remote = getattr(source, 'remote', False)
+        self._requested = OrderedDict()
+        self._fetching = None  # (bloco, tarefa)
+        # Cada nova consulta (filtro ou ordenação) descarta os blocos lidos para a anterior
+        self._generation = 0
+        # Fontes sem contagem conhecida (consulta filtrada) crescem com fetchMore
+        self._fetched_rows = 0
+        self._exhausted = False
+        if self._source.row_count is None:
+            self.fetchMore()
+        
+    @property
+    def can_query(self):
+        # Filtro e ordenação executados pela própria fonte (ex.: SQL no SQLite)
+        return getattr(self._source, 'can_query', False)
+        
+    @property
+    def columns(self):
+        return self._source.columns
+        
+    def _request_block(self, block, prefetch=False):
+        if block in self._blocks or (self._fetching and self._fetching[0] == block):
+            return
+        if block in self._requested:
+            self._requested.move_to_end(block, last=not prefetch)
+        else:
+            self._requested[block] = prefetch
+            self._requested.move_to_end(block, last=not prefetch)
+            while len(self._requested) > self._cache_blocks:
+                self._requested.popitem(last=False)
+        self._start_fetch()
+        
+    def _start_fetch(self):
+        if self._fetching is not None or not self._requested:
+            return
+        block, prefetch = self._requested.popitem(last=True)
+        if block in self._blocks:
+            return self._start_fetch()
+        generation = self._generation
+        source = self._source
+        task = BackgroundTask(lambda progress: source.read_block(block))
+        task.finished.connect(lambda df: self._on_block_fetched(block, prefetch, generation, df))
+        task.failed.connect(lambda message: self._on_fetch_failed(generation, message))
+        self._fetching = (block, task)
+        task.start()
+        
+    def _on_block_fetched(self, block, prefetch, generation, df):
+        self._fetching = None
+        if generation != self._generation:
+            return self._start_fetch()  # bloco da consulta anterior ao filtro/ordenação
+        self._blocks[block] = df
+        while len(self._blocks) > self._cache_blocks:
+            self._blocks.popitem(last=False)
+        start = self._source.block_start(block)
+        if self._source.row_count is None:
+            self._append_rows(start, df)
+        elif self._remote:
+            self._settle_row_count(block, df)
+        end = min(start + len(df), self.rowCount()) - 1
+        if end >= start:
+            self.dataChanged.emit(self.index(start, 0), self.index(end, self.columnCount() - 1))
+        block_count = self._source.block_count
+        if not prefetch and block_count is not None:
+            # Próximos blocos antecipados, com prioridade menor que os pedidos pela vista
+            for neighbour in range(block + 1, min(block + 1 + WINDOW_PREFETCH_BLOCKS, block_count)):
+                self._request_block(neighbour, prefetch=True)
+        self._start_fetch()
+        
+    def _on_fetch_failed(self, generation, message):
+        self._fetching = None
+        if generation != self._generation:
+            return self._start_fetch()
+        self._requested.clear()
+        self._exhausted = True  # fetchMore não repete a leitura que falhou
+        self.fetch_failed.emit(message)
+        
+    def _append_rows(self, start, df):
+        # Contagem desconhecida: o bloco seguinte ao último lido acrescenta linhas
+        if start != self._fetched_rows:
+            return
+        if len(df) < self._source.block_rows:
+            self._exhausted = True
+        if len(df):
+            self.beginInsertRows(QModelIndex(), start, start + len(df) - 1)
+            self._fetched_rows += len(df)
+            self.endInsertRows()
+        
+    def _settle_row_count(self, block, df):
+        # A contagem remota é estimada: o fim real aparece numa página incompleta,
+        # e uma página cheia no fim estimado indica que há mais linhas
+        rows = self._source.row_count
+        end = self._source.block_start(block) + len(df)
+        if getattr(self._source, 'exact_row_count', None) is not None:
+            exact = self._source.exact_row_count
+        elif len(df) < self._source.block_rows:
+            exact = end
+        elif end >= rows:
+            exact = end + self._source.block_rows
+        else:
+            return
+        if exact < rows:
+            self.beginRemoveRows(QModelIndex(), exact, rows - 1)
+            self._source.row_count = exact
+            self.endRemoveRows()
+        elif exact > rows:
+            self.beginInsertRows(QModelIndex(), rows, exact - 1)
+            self._source.row_count = exact
+            self.endInsertRows()
+                
+    def _row_key(self, row, df, offset):
+        return df.index[offset] if self._source.keyed else row
+        
+    def _change_query(self, change):
+        # A fonte só muda sem leitura em andamento; o bloco dessa leitura chega
+        # depois e é descartado pela geração
+        if self._fetching is not None:
+            self._fetching[1].wait()
+        self.beginResetModel()
+        change()
+        self._generation += 1
+        self._requested.clear()
+        self._blocks.clear()
+        self._fetched_rows = 0
+        self._exhausted = False
+        if not self._source.keyed:
+            self._edits.clear()  # as posições mudam com a nova consulta
+        self.endResetModel()
+        if self._source.row_count is None:
+            self.fetchMore()
+        
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        if self._source.row_count is not None:
+            return self._source.row_count
+        return self._fetched_rows
+        
+    def columnCount(self, parent=QModelIndex()):
+        return len(self._source.columns)
+        
+    def canFetchMore(self, parent=QModelIndex()):
+        return self._source.row_count is None and not self._exhausted
+        
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        block, _ = self._source.locate(self._fetched_rows)
+        self._request_block(block)
+        
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+            
+        if role == Qt.DisplayRole or role == Qt.EditRole:
+            row, col = index.row(), index.column()
+            block, offset = self._source.locate(row)
+            df = self._blocks.get(block)
+            if df is None:
+                # Célula vazia até o bloco chegar da thread de leitura (dataChanged)
+                self._request_block(block)
+                return ""
+            self._blocks.move_to_end(block)
+            if offset >= len(df):
+                return ""
+            key = (self._row_key(row, df, offset), col)
+            if key in self._edits:
+                return str(self._edits[key])
+            return str(df.iat[offset, col])
+            
+        if role == Qt.BackgroundRole:
+            return QColor(45, 45, 45)
+            
+        if role == Qt.ForegroundRole:
+            return QColor(200, 200, 200)
+            
+        return None
+        
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole:
+            if orientation == Qt.Horizontal:
+                return str(self._source.columns[section])
+            else:
+                return str(section)
+        return None
+        
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+            
+        row = index.row()
+        col = index.column()
+        block, offset = self._source.locate(row)
+        df = self._blocks.get(block)
+        if df is None or offset >= len(df):
+            return False
+        key = (self._row_key(row, df, offset), col)
+        
+        try:
+            # Try to convert to original dtype if possible
+            orig_dtype = df.iloc[:, col].dtype
+            self._edits[key] = pd.Series([value], dtype=orig_dtype)[0]
+        except:
+            # If conversion fails, use string value
+            self._edits[key] = value
+            
+        self.dataChanged.emit(index, index)
+        self.edited.emit(index, index)
+        return True
+        
+    def flags(self, index):
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
+        
+    def sort(self, column, order=Qt.AscendingOrder):
+        if not self.can_query:
+            return
+        self._change_query(lambda: self._source.set_sort(column if column >= 0 else None,
+                                                         order == Qt.DescendingOrder))
+        
+    def set_filter_text(self, text):
+        if not self.can_query:
+            return
+        self._change_query(lambda: self._source.set_filter(text))
+        
+    def reads_from(self, file_name, table=None):
+        # Se a gravação em file_name (e table, no SQLite) substitui os dados de onde os
+        # blocos são lidos: deslocamentos em bytes, rowids e edições deixam de valer
+        source_file = getattr(self._source, 'file_name', None)
+        if source_file is None or os.path.abspath(source_file) != os.path.abspath(file_name):
+            return False
+        return table is None or getattr(self._source, 'table', table) == table
+        
+    def iter_frames(self):
+        # Tabela inteira em blocos, na ordem original e sem filtro, com as edições
+        # aplicadas. As edições são copiadas agora; os blocos são lidos da fonte (não
+        # da janela em cache), então o gerador pode ser consumido em outra thread
+        return apply_edits(self._source.iter_frames(), dict(self._edits), self._source.keyed)
+        
+    def get_dataframe(self):
+        # Materializa a tabela inteira (necessário para formatos sem gravação em blocos)
+        frames = list(self.iter_frames())
+        if not frames:
+            return pd.DataFrame(columns=self._source.columns)
+        return pd.concat(frames, ignore_index=True)
+
+def apply_edits(frames, edits, keyed):
+    # Edições (chave da linha, coluna) -> valor por cima dos blocos lidos da fonte;
+    # a chave é o índice do bloco (rowid) ou a posição da linha na tabela
+    start = 0
+    for df in frames:
+        for (key, col), value in edits.items():
+            if keyed:
+                if key not in df.index:
+                    continue
+                position = df.index.get_loc(key)
+            elif start <= key < start + len(df):
+                position = key - start
+            else:
+                continue
+            try:
+                df.iloc[position, col] = value
+            except (TypeError, ValueError):
+                df.isetitem(col, df.iloc[:, col].astype(object))
+                df.iloc[position, col] = value
+        start += len(df)
+        yield df.reset_index(drop=True)
+
+class TaskCancelled(Exception):
+    pass
+
+class ProgressFile(io.RawIOBase):
+    # Arquivo binário que informa quantos bytes já foram lidos
+    def __init__(self, file_name, progress):
+        super().__init__()
+        self._file = open(file_name, 'rb', buffering=0)
+        self._size = os.path.getsize(file_name)
+        self._progress = progress
+        
+    def readable(self):
+        return True
+        
+    def seekable(self):
+        return True
+        
+    def readinto(self, buffer):
+        count = self._file.readinto(buffer)
+        self._progress(self._file.tell(), self._size)
+        return count
+        
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self._file.seek(offset, whence)
+        
+    def tell(self):
+        return self._file.tell()
+        
+    def close(self):
+        self._file.close()
+        super().close()
+
+def open_with_progress(file_name, progress, encoding=None):
+    stream = io.BufferedReader(ProgressFile(file_name, progress), buffer_size=1024 * 1024)
+    if encoding:
+        return io.TextIOWrapper(stream, encoding=encoding)
+    return stream
+
+def read_csv_file(file_name, progress, columns=None):
+    # Uma única passagem pelo arquivo: lê em blocos de linhas e o progresso
+    # vem dos bytes consumidos, sem contar as linhas antes
+    with open_with_progress(file_name, progress) as f:
+        chunks = list(pd.read_csv(f, chunksize=CSV_CHUNK_ROWS, usecols=columns))
+    if len(chunks) == 1:
+        return chunks[0]
+    return pd.concat(chunks, ignore_index=True)
+
+def sniff_csv_file(file_name):
+    return list(pd.read_csv(file_name, nrows=0).columns)
+
+def write_csv_file(df, file_name, progress):
+    total = len(df)
+    with open(file_name, 'w', encoding='utf-8', newline='') as f:
+        for start in range(0, max(total, 1), CSV_CHUNK_ROWS):
+            df.iloc[start:start + CSV_CHUNK_ROWS].to_csv(f, index=False, header=(start == 0))
+            progress(min(start + CSV_CHUNK_ROWS, total), total)
+
+def write_csv_frames(frames, file_name, progress, total):
+    # CSV de uma tabela em janela, bloco a bloco
+    header = True
+    done = 0
+    with open(file_name, 'w', encoding='utf-8', newline='') as f:
+        for df in frames:
+            df.to_csv(f, index=False, header=header)
+            header = False
+            done += len(df)
+            progress(done, total)
+
+def excel_engine(file_name):
+    # calamine (Rust) é o leitor mais rápido; sem ele, .xlsx usa openpyxl em modo somente leitura
+    if module_available("python_calamine"):
+        return "calamine"
+    if file_name.lower().endswith('.xls'):
+        return "xlrd"
+    return "openpyxl"
+
+def excel_sheet_names(file_name):
+    if excel_engine(file_name) == "openpyxl":
+        import openpyxl
+        workbook = openpyxl.load_workbook(file_name, read_only=True)
+        try:
+            return list(workbook.sheetnames)
+        finally:
+            workbook.close()
+    with pd.ExcelFile(file_name, engine=excel_engine(file_name)) as workbook:
+        return list(workbook.sheet_names)
+
+def excel_header(values):
+    # Mesmos nomes que o pandas daria: "Unnamed: n" para vazios e ".n" para repetidos
+    names = []
+    seen = {}
+    for position, value in enumerate(values):
+        name = f"Unnamed: {position}" if value is None else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+def read_excel_file(file_name, progress, sheet=None, columns=None, first_row=None, last_row=None):
+    # first_row/last_row contam as linhas de dados a partir de 1 (o cabeçalho não conta)
+    engine = excel_engine(file_name)
+    if engine != "openpyxl":
+        skiprows = range(1, first_row) if first_row and first_row > 1 else None
+        nrows = last_row - (first_row or 1) + 1 if last_row else None
+        progress(0, 1)
+        return pd.read_excel(file_name, sheet_name=sheet or 0, usecols=columns,
+                             skiprows=skiprows, nrows=nrows, engine=engine)
+    
+    import openpyxl
+    workbook = openpyxl.load_workbook(file_name, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.worksheets[0]
+        header = next(worksheet.iter_rows(max_row=1, values_only=True), None)
+        if header is None:
+            return pd.DataFrame()
+        names = excel_header(header)
+        
+        # Projeção: só as colunas pedidas são convertidas, dentro do menor intervalo que as contém
+        positions = [names.index(column) for column in columns] if columns else list(range(len(names)))
+        selected = [names[position] for position in positions]
+        min_col = min(positions) + 1 if positions else 1
+        max_col = max(positions) + 1 if positions else 1
+        offsets = [position - min_col + 1 for position in positions]
+        
+        min_row = (first_row or 1) + 1
+        max_row = last_row + 1 if last_row else None
+        total = (max_row or worksheet.max_row or 0) - min_row + 1
+        
+        frames = []
+        batch = []
+        # Linhas vazias só entram quando aparece uma linha com dados depois delas: como
+        # no pd.read_excel, as vazias do fim (planilha formatada além dos dados) ficam fora
+        blank = 0
+        empty = (None,) * len(offsets)
+        read = 0
+        
+        def add(values):
+            nonlocal batch
+            batch.append(values)
+            if len(batch) == EXCEL_BATCH_ROWS:
+                frames.append(pd.DataFrame(batch, columns=selected))
+                batch = []
+                
+        rows = worksheet.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col,
+                                   max_col=max_col, values_only=True)
+        for row in rows:
+            read += 1
+            if read % EXCEL_BATCH_ROWS == 0:
+                progress(read, total)
+            if all(value is None for value in row):
+                blank += 1
+                continue
+            for _ in range(blank):
+                add(empty)
+            blank = 0
+            add(tuple(row[offset] if offset < len(row) else None for offset in offsets))
+        
+        if batch or not frames:
+            frames.append(pd.DataFrame(batch, columns=selected))
+    finally:
+        workbook.close()
+    
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
+
+def sniff_excel_file(file_name, sheet=None):
+    if excel_engine(file_name) != "openpyxl":
+        return list(pd.read_excel(file_name, sheet_name=sheet or 0, nrows=0,
+                                  engine=excel_engine(file_name)).columns)
+    import openpyxl
+    workbook = openpyxl.load_workbook(file_name, read_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.worksheets[0]
+        header = next(worksheet.iter_rows(max_row=1, values_only=True), None)
+        return excel_header(header) if header else []
+    finally:
+        workbook.close()
+
+class ExcelImportDialog(QDialog):
+    # Escolha da planilha, das colunas e do intervalo de linhas antes de importar
+    def __init__(self, file_name, parent=None, sheets=None):
+        super().__init__(parent)
+        self.file_name = file_name
+        self.setWindowTitle("Importar Excel")
+        self.setMinimumWidth(400)
+        
+        layout = QVBoxLayout(self)
+        form = QFormLayout()
+        
+        self.sheet_combo = QComboBox()
+        self.sheet_combo.addItems(sheets if sheets is not None else excel_sheet_names(file_name))
+        self.sheet_combo.currentTextChanged.connect(self.load_columns)
+        form.addRow("Planilha:", self.sheet_combo)
+        
+        self.first_row_spin = QSpinBox()
+        self.first_row_spin.setRange(1, EXCEL_MAX_ROWS)
+        form.addRow("Primeira linha:", self.first_row_spin)
+        
+        self.last_row_spin = QSpinBox()
+        self.last_row_spin.setRange(0, EXCEL_MAX_ROWS)
+        self.last_row_spin.setSpecialValueText("Até o fim")
+        form.addRow("Última linha:", self.last_row_spin)
+        layout.addLayout(form)
+        
+        layout.addWidget(QLabel("Colunas:"))
+        self.columns_list = QListWidget()
+        layout.addWidget(self.columns_list)
+        
+        buttons = QHBoxLayout()
+        ok_button = QPushButton("Importar")
+        cancel_button = QPushButton("Cancelar")
+        ok_button.clicked.connect(self.accept)
+        cancel_button.clicked.connect(self.reject)
+        buttons.addWidget(ok_button)
+        buttons.addWidget(cancel_button)
+        layout.addLayout(buttons)
+        
+        self.load_columns(self.sheet_combo.currentText())
+        
+    def load_columns(self, sheet):
+        self.columns_list.clear()
+        for column in sniff_excel_file(self.file_name, sheet):
+            item = QListWidgetItem(str(column))
+            item.setData(Qt.UserRole, column)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked)
+            self.columns_list.addItem(item)
+            
+    def options(self):
+        items = [self.columns_list.item(row) for row in range(self.columns_list.count())]
+        columns = [item.data(Qt.UserRole) for item in items if item.checkState() == Qt.Checked]
+        return {
+            'sheet': self.sheet_combo.currentText() or None,
+            'columns': columns if len(columns) < len(items) else None,
+            'first_row': self.first_row_spin.value(),
+            'last_row': self.last_row_spin.value() or None,
+        }
+
+def ask_excel_options(parent, file_name):
+    # Pasta com uma planilha só: abre direto, sem perguntar
+    sheets = excel_sheet_names(file_name)
+    if len(sheets) <= 1:
+        return {}
+    dialog = ExcelImportDialog(file_name, parent, sheets)
+    if dialog.exec() != QDialog.Accepted:
+        return None
+    return dialog.options()
+
+def excel_row_values(batch):
+    # Valores que as bibliotecas de Excel aceitam: NaN/NaT viram células vazias e
+    # objetos desconhecidos (listas, dicionários...) viram texto
+    import datetime
+    values = batch.astype(object).where(batch.notna(), None)
+    native = (str, int, float, bool, datetime.date, datetime.time, datetime.timedelta)
+    for column in values.columns[(batch.dtypes == object).to_numpy()]:
+        values[column] = values[column].map(
+            lambda value: value if value is None or isinstance(value, native) else str(value))
+    return values.itertuples(index=False, name=None)
+
+def write_excel_file(df, file_name, progress):
+    # Escrita em memória constante, em lotes de linhas; tabelas maiores que o
+    # limite do Excel continuam em novas planilhas (Sheet2, Sheet3...)
+    total = len(df)
+    header = list(df.columns)
+    sheet_rows = EXCEL_MAX_ROWS - 1
+    sheet_starts = range(0, max(total, 1), sheet_rows)
+    
+    if module_available("xlsxwriter"):
+        import xlsxwriter
+        workbook = xlsxwriter.Workbook(file_name, {'constant_memory': True,
+                                                   'nan_inf_to_errors': True,
+                                                   'default_date_format': 'yyyy-mm-dd hh:mm:ss'})
+        try:
+            for sheet_number, sheet_start in enumerate(sheet_starts, start=1):
+                worksheet = workbook.add_worksheet(f"Sheet{sheet_number}")
+                worksheet.write_row(0, 0, header)
+                row_number = 1
+                sheet_end = min(sheet_start + sheet_rows, total)
+                for start in range(sheet_start, sheet_end, EXCEL_BATCH_ROWS):
+                    for row in excel_row_values(df.iloc[start:min(start + EXCEL_BATCH_ROWS, sheet_end)]):
+                        worksheet.write_row(row_number, 0, row)
+                        row_number += 1
+                    progress(min(start + EXCEL_BATCH_ROWS, sheet_end), total)
+        finally:
+            workbook.close()
+        return
+    
+    import openpyxl
+    workbook = openpyxl.Workbook(write_only=True)
+    for sheet_number, sheet_start in enumerate(sheet_starts, start=1):
+        worksheet = workbook.create_sheet(f"Sheet{sheet_number}")
+        worksheet.append(header)
+        sheet_end = min(sheet_start + sheet_rows, total)
+        for start in range(sheet_start, sheet_end, EXCEL_BATCH_ROWS):
+            for row in excel_row_values(df.iloc[start:min(start + EXCEL_BATCH_ROWS, sheet_end)]):
+                worksheet.append(row)
+            progress(min(start + EXCEL_BATCH_ROWS, sheet_end), total)
+    workbook.save(file_name)
+
+def quote_identifier(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+def sql_like_pattern(text):
+    # Padrão LIKE de "contém", com % e _ do texto escapados (ESCAPE '\')
+    return "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+def sqlite_tables(file_name):
+    # Tabelas e visões do arquivo, sem as tabelas internas do SQLite
+    import sqlite3
+    
+    conn = sqlite3.connect(file_name)
+    try:
+        return conn.execute(
+            "SELECT name, type FROM sqlite_master WHERE type IN ('table', 'view') "
+            "AND name NOT LIKE 'sqlite_%' ORDER BY type, name").fetchall()
+    finally:
+        conn.close()
+
+def sqlite_trigram_index(conn, table):
+    # Tabela FTS5 com tokenizador trigram sobre a tabela (content=...), se houver:
+    # responde buscas por substring sem varrer a tabela inteira
+    import re
+    
+    for name, sql in conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'table' "
+                                  "AND sql LIKE '%fts5%' AND sql LIKE '%trigram%'"):
+        match = re.search(r"content\s*=\s*['\"]?([^'\",)]+)", sql, re.IGNORECASE)
+        if match and match.group(1).strip() == table:
+            columns = [description[0] for description in
+                       conn.execute(f"SELECT * FROM {quote_identifier(name)} LIMIT 0").description]
+            return name, columns
+    return None
+
+def sqlite_nocase_columns(conn, table):
+    # Colunas que começam algum índice com colação NOCASE
+    columns = set()
+    for index in conn.execute(f"PRAGMA index_list({quote_identifier(table)})").fetchall():
+        for _, _, name, _, collation, key in conn.execute(
+                f"PRAGMA index_xinfo({quote_identifier(index[1])})").fetchall()[:1]:
+            if key and name is not None and collation.upper() == 'NOCASE':
+                columns.add(name)
+    return columns
+
+class SQLiteTableSource:
+    # Tabela ou visão SQLite lida por páginas sob demanda. Tabelas com rowid usam
+    # paginação keyset (WHERE rowid > ? LIMIT ?); visões e tabelas WITHOUT ROWID
+    # caem para LIMIT/OFFSET. Filtro e ordenação viram WHERE/ORDER BY na consulta
+    can_query = True
+    
+    def __init__(self, file_name, table, columns=None, block_rows=SQLITE_PAGE_ROWS, progress=None):
+        import sqlite3
+        
+        self.file_name = file_name
+        self.table = table
+        self.block_rows = block_rows
+        self._conn = None
+        # bloco -> (valor da coluna ordenada, rowid) do último registro do bloco
+        self._bounds = {}
+        self._where = ""
+        self._params = ()
+        self._sort = None  # (coluna, decrescente)
+        
+        conn = sqlite3.connect(file_name)
+        try:
+            self._from = quote_identifier(table)
+            self._select = ", ".join(quote_identifier(column) for column in columns) if columns else "*"
+            cursor = conn.execute(f"SELECT {self._select} FROM {self._from} LIMIT 0")
+            self.columns = [description[0] for description in cursor.description]
+            kind = conn.execute("SELECT type FROM sqlite_master WHERE name = ?", (table,)).fetchone()
+            self._has_rowid = kind is not None and kind[0] == 'table'
+            if self._has_rowid:
+                try:
+                    conn.execute(f"SELECT rowid FROM {self._from} LIMIT 0")
+                except sqlite3.OperationalError:
+                    self._has_rowid = False
+            self._trigram = sqlite_trigram_index(conn, table) if self._has_rowid else None
+            self._nocase = sqlite_nocase_columns(conn, table)
+            if progress:
+                progress(1, 2)
+            self._total = conn.execute(f"SELECT COUNT(*) FROM {self._from}").fetchone()[0]
+        finally:
+            conn.close()
+            
+    def _connection(self):
+        # Aberta na primeira leitura; as páginas são lidas uma por vez, cada uma numa
+        # thread de trabalho do modelo
+        if self._conn is None:
+            import sqlite3
+            self._conn = sqlite3.connect(self.file_name, check_same_thread=False)
+        return self._conn
+        
+    @property
+    def keyed(self):
+        # Blocos indexados pelo rowid: edições sobrevivem a filtro e ordenação
+        return self._has_rowid
+        
+    @property
+    def row_count(self):
+        # Com filtro ativo a contagem fica desconhecida; o modelo busca páginas
+        # até a consulta se esgotar em vez de rodar um COUNT(*) filtrado
+        return None if self._where else self._total
+        
+    @property
+    def block_count(self):
+        if self.row_count is None:
+            return None
+        return -(-self.row_count // self.block_rows)
+        
+    def locate(self, row):
+        return row // self.block_rows, row % self.block_rows
+        
+    def block_start(self, block):
+        return block * self.block_rows
+        
+    def set_filter(self, text):
+        # Busca livre ou expressão da linguagem de filtro, traduzida para WHERE
+        self._bounds.clear()
+        if not text:
+            self._where, self._params = "", ()
+            return
+        query, _ = filter_query(text, self.columns)
+        where, params = self._condition(query)
+        self._where, self._params = where, tuple(params)
+        
+    def _condition(self, node):
+        # Mesma semântica do filtro em memória (NULL contando como "diferente" e "não
+        # contém"), exceto na igualdade de textos: diferencia maiúsculas para usar os índices
+        kind = node[0]
+        if kind == 'text':
+            return self._text_condition(node[1])
+        if kind == 'not':
+            sql, params = self._condition(node[1])
+            return f"NOT COALESCE({sql}, 0)", params
+        if kind in ('and', 'or'):
+            left, left_params = self._condition(node[1])
+            right, right_params = self._condition(node[2])
+            return f"({left} {kind.upper()} {right})", left_params + right_params
+        _, col, op, value = node
+        column = quote_identifier(self.columns[col])
+        if value is None:
+            return f"{column} IS {'NOT ' if op == '!=' else ''}NULL", []
+        if op in ('~', '!~'):
+            like = f"{column} LIKE ? ESCAPE '\\'"
+            if op == '!~':
+                like = f"({column} IS NULL OR NOT {like})"
+            return like, [sql_like_pattern(str(value))]
+        # COLLATE NOCASE só onde há índice NOCASE na coluna: com a colação BINARY de
+        # sempre o SQLite deixaria de usar o índice e varreria a tabela
+        collate = " COLLATE NOCASE" if isinstance(value, str) and self.columns[col] in self._nocase else ""
+        if op == '!=':
+            return f"({column} IS NULL OR {column} <>{collate} ?)", [value]
+        return f"{column} {'=' if op == '==' else op} ?{collate}", [value]
+        
+    def _text_condition(self, text):
+        # Texto em qualquer coluna: FTS5 trigram quando existe, LIKE nas demais
+        pattern = sql_like_pattern(text)
+        columns = self.columns
+        terms, params = [], []
+        if self._trigram and len(text) >= 3:
+            fts_table, fts_columns = self._trigram
+            terms.append(f"rowid IN (SELECT rowid FROM {quote_identifier(fts_table)} "
+                         f"WHERE {quote_identifier(fts_table)} MATCH ?)")
+            params.append('"' + text.replace('"', '""') + '"')
+            columns = [column for column in columns if column not in fts_columns]
+        for column in columns:
+            terms.append(f"{quote_identifier(column)} LIKE ? ESCAPE '\\'")
+            params.append(pattern)
+        return ("(" + " OR ".join(terms) + ")" if terms else "1"), params
+        
+    def set_sort(self, column, descending=False):
+        self._bounds.clear()
+        self._sort = None if column is None else (self.columns[column], descending)
+        
+    def _order_by(self):
+        order = []
+        if self._sort:
+            column, descending = self._sort
+            order.append(quote_identifier(column) + (" DESC" if descending else ""))
+        if self._has_rowid:
+            order.append("rowid")
+        return " ORDER BY " + ", ".join(order) if order else ""
+        
+    def _after(self, bound):
+        # Condição keyset para continuar depois de (valor, rowid) na ordem atual;
+        # no SQLite NULL vem primeiro em ASC e por último em DESC
+        value, rowid = bound
+        if not self._sort:
+            return "rowid > ?", (rowid,)
+        column = quote_identifier(self._sort[0])
+        if not self._sort[1]:
+            if value is None:
+                return f"(({column} IS NULL AND rowid > ?) OR {column} IS NOT NULL)", (rowid,)
+            return f"({column} >= ? AND ({column} > ? OR rowid > ?))", (value, value, rowid)
+        if value is None:
+            return f"({column} IS NULL AND rowid > ?)", (rowid,)
+        return (f"(({column} <= ? AND ({column} < ? OR rowid > ?)) OR {column} IS NULL)",
+                (value, value, rowid))
+                
+    def _query(self, select, conditions, params, limit, offset=0):
+        if self._where:
+            conditions = [self._where] + conditions
+            params = self._params + params
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        return self._connection().execute(
+            f"SELECT {select} FROM {self._from}{where}{self._order_by()} LIMIT ? OFFSET ?",
+            params + (limit, offset))
+            
+    def _sort_key(self):
+        return quote_identifier(self._sort[0]) if self._sort else "NULL"
+        
+    def _bound(self, block):
+        if block not in self._bounds:
+            # Bloco anterior ainda não lido: busca a chave pelo índice da tabela
+            row = self._query(f"{self._sort_key()}, rowid", [], (), 1,
+                              (block + 1) * self.block_rows - 1).fetchone()
+            self._bounds[block] = tuple(row) if row else None
+        return self._bounds[block]
+        
+    def read_block(self, block):
+        if not self._has_rowid:
+            cursor = self._query(self._select, [], (), self.block_rows, block * self.block_rows)
+            return pd.DataFrame.from_records(cursor.fetchall(), columns=self.columns)
+        
+        select = f"{self._sort_key()}, rowid, {self._select}"
+        if block == 0:
+            cursor = self._query(select, [], (), self.block_rows)
+        else:
+            bound = self._bound(block - 1)
+            if bound is None:
+                return pd.DataFrame(columns=self.columns)
+            condition, params = self._after(bound)
+            cursor = self._query(select, [condition], params, self.block_rows)
+        rows = cursor.fetchall()
+        if rows:
+            self._bounds[block] = tuple(rows[-1][:2])
+        return pd.DataFrame.from_records([row[2:] for row in rows], columns=self.columns,
+                                         index=[row[1] for row in rows])
+        
+    def iter_frames(self):
+        # Tabela inteira na ordem natural, ignorando filtro e ordenação da vista. Roda
+        # na thread de gravação: usa uma conexão própria, não a da interface
+        import sqlite3
+        
+        conn = sqlite3.connect(self.file_name)
+        try:
+            key = "rowid, " if self._has_rowid else ""
+            cursor = conn.execute(f"SELECT {key}{self._select} FROM {self._from}")
+            while True:
+                rows = cursor.fetchmany(self.block_rows)
+                if not rows:
+                    break
+                if self._has_rowid:
+                    yield pd.DataFrame.from_records([row[1:] for row in rows], columns=self.columns,
+                                                    index=[row[0] for row in rows])
+                else:
+                    yield pd.DataFrame.from_records(rows, columns=self.columns)
+        finally:
+            conn.close()
+
+def read_sqlite_file(file_name, progress, table=None, columns=None):
+    if table is None:
+        tables = sqlite_tables(file_name)
+        if len(tables) == 0:
+            raise ValueError("O arquivo SQLite não contém tabelas.")
+        table = tables[0][0]
+    return SQLiteTableSource(file_name, table, columns=columns, progress=progress)
+
+def sniff_sqlite_file(file_name, table=None):
+    import sqlite3
+    
+    if table is None:
+        tables = sqlite_tables(file_name)
+        if not tables:
+            return []
+        table = tables[0][0]
+    conn = sqlite3.connect(file_name)
+    try:
+        cursor = conn.execute(f"SELECT * FROM {quote_identifier(table)} LIMIT 0")
+        return [description[0] for description in cursor.description]
+    finally:
+        conn.close()
+
+def ask_sqlite_options(parent, file_name):
+    tables = sqlite_tables(file_name)
+    if len(tables) <= 1:
+        return {}
+    labels = [name if kind == 'table' else f"{name} (visão)" for name, kind in tables]
+    label, ok = QInputDialog.getItem(parent, "Abrir SQLite", "Tabela ou visão:", labels, 0, False)
+    if not ok:
+        return None
+    return {'table': tables[labels.index(label)][0]}
+
+def sqlite_affinity(column):
+    # Afinidade declarada a partir do dtype; colunas object são inspecionadas
+    kind = column.dtype.kind
+    if kind in 'iub':
+        return "INTEGER"
+    if kind == 'f':
+        return "REAL"
+    if kind in 'MmU':
+        return "TEXT"
+    inferred = pd.api.types.infer_dtype(column, skipna=True)
+    if inferred in ('integer', 'boolean'):
+        return "INTEGER"
+    if inferred in ('floating', 'mixed-integer-float', 'decimal'):
+        return "REAL"
+    if inferred == 'bytes':
+        return "BLOB"
+    if inferred in ('string', 'datetime', 'datetime64', 'date', 'time'):
+        return "TEXT"
+    return ""
+
+def sql_rows(chunk, nan_is_null=False):
+    # Valores nativos do Python, com NULL no lugar de NaN/NaT/NA
+    columns = []
+    for _, column in chunk.items():
+        kind = column.dtype.kind
+        if isinstance(column.dtype, np.dtype) and (
+                kind in 'iub' or (kind == 'f' and (nan_is_null or not column.hasnans))):
+            # Caminho rápido: sem valores ausentes, ou o banco (SQLite) já grava NaN como NULL
+            columns.append(column.to_numpy().tolist())
+            continue
+        if column.dtype.kind in 'Mm':
+            values = column.astype(str)
+        else:
+            values = column.astype(object)
+        columns.append(values.where(column.notna(), None).tolist())
+    return zip(*columns)
+
+class SQLiteExportDialog(QDialog):
+    # Nome da tabela de destino e coluna opcional para indexar depois da carga
+    def __init__(self, file_name, columns, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Salvar SQLite")
+        self.setMinimumWidth(400)
+        
+        layout = QVBoxLayout(self)
+        form = QFormLayout()
+        
+        self.table_input = QLineEdit("data")
+        form.addRow("Tabela:", self.table_input)
+        
+        self.index_combo = QComboBox()
+        self.index_combo.addItem("(nenhum)", None)
+        for column in columns:
+            self.index_combo.addItem(str(column), column)
+        form.addRow("Criar índice em:", self.index_combo)
+        layout.addLayout(form)
+        
+        buttons = QHBoxLayout()
+        ok_button = QPushButton("Salvar")
+        cancel_button = QPushButton("Cancelar")
+        ok_button.clicked.connect(self.accept)
+        cancel_button.clicked.connect(self.reject)
+        buttons.addWidget(ok_button)
+        buttons.addWidget(cancel_button)
+        layout.addLayout(buttons)
+        
+    def options(self):
+        return {
+            'table': self.table_input.text().strip() or "data",
+            'index_column': self.index_combo.currentData(),
+        }
+
+def ask_sqlite_save_options(parent, file_name, columns):
+    dialog = SQLiteExportDialog(file_name, columns, parent)
+    if dialog.exec() != QDialog.Accepted:
+        return None
+    return dialog.options()
+
+def write_sqlite_file(df, file_name, progress, table="data", index_column=None):
+    import sqlite3
+    
+    # isolation_level=None: a transação única é controlada explicitamente abaixo
+    conn = sqlite3.connect(file_name, isolation_level=None)
+    try:
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            
+            name = quote_identifier(table)
+            definitions = ", ".join(f"{quote_identifier(column)} {sqlite_affinity(df[column])}".rstrip()
+                                    for column in df.columns)
+            placeholders = ", ".join("?" * len(df.columns))
+            total = len(df)
+            conn.execute("BEGIN")
+            try:
+                conn.execute(f"DROP TABLE IF EXISTS {name}")
+                conn.execute(f"CREATE TABLE {name} ({definitions})")
+                for start in range(0, total, SQLITE_WRITE_ROWS):
+                    chunk = df.iloc[start:start + SQLITE_WRITE_ROWS]
+                    conn.executemany(f"INSERT INTO {name} VALUES ({placeholders})", sql_rows(chunk, nan_is_null=True))
+                    progress(start + len(chunk), total + (index_column is not None))
+                if index_column is not None:
+                    # Índice criado depois da carga: uma ordenação só, em vez de a cada INSERT
+                    conn.execute(f"CREATE INDEX {quote_identifier(f'idx_{table}_{index_column}')} "
+                                 f"ON {name} ({quote_identifier(index_column)})")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            # Modo de journal e sincronização do arquivo voltam ao original também
+            # depois de erro ou cancelamento
+            conn.execute(f"PRAGMA journal_mode={journal_mode}")
+            conn.execute(f"PRAGMA synchronous={synchronous}")
+    finally:
+        conn.close()
+    progress(1, 1)
+
+def json_loads():
+    # Usa o orjson quando instalado; é bem mais rápido que o json da biblioteca padrão
+    if module_available("orjson"):
+        import orjson
+        return orjson.loads
+    return json.loads
+
+def iter_json_array(f, chunk_size=1024 * 1024):
+    # Percorre os itens de um array JSON de nível superior sem carregar o arquivo
+    # todo: o texto é lido em blocos e cada item é decodificado com raw_decode
+    import re
+    decoder = json.JSONDecoder()
+    separators = re.compile(r'[\s,]*')
+    whitespace = re.compile(r'\s*')
+    buffer = ''
+    pos = 0
+    
+    def fill():
+        nonlocal buffer, pos
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+    
+    while True:
+        pos = separators.match(buffer, pos).end()
+        if pos < len(buffer):
+            break
+        if not fill():
+            return
+    if buffer[pos] != '[':
+        raise ValueError("O arquivo JSON não é um array de registros")
+    pos += 1
+    
+    while True:
+        pos = separators.match(buffer, pos).end()
+        if pos >= len(buffer):
+            if not fill():
+                raise ValueError("Arquivo JSON incompleto")
+            continue
+        if buffer[pos] == ']':
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if not fill():
+                raise
+            continue
+        # O item só está completo se vier seguido de ',' ou ']': um número cortado pelo
+        # bloco ("-3." de "-3.5e10") também é aceito por raw_decode. Lê mais e decodifica de novo
+        following = whitespace.match(buffer, end).end()
+        if following == len(buffer) or buffer[following] not in ',]':
+            if fill():
+                continue
+            raise ValueError("Arquivo JSON incompleto ou inválido")
+        yield item
+        pos = end
+
+def normalize_json_batches(items):
+    # Normaliza os registros em lotes, cada lote vira um DataFrame colunar
+    frames = []
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == JSON_BATCH_ROWS:
+            frames.append(pd.json_normalize(batch))
+            batch = []
+    if batch or not frames:
+        frames.append(pd.json_normalize(batch))
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
+
+def first_json_char(file_name):
+    with open(file_name, 'rb') as f:
+        while True:
+            chunk = f.read(4096)
+            if not chunk:
+                return ''
+            stripped = chunk.lstrip(b' \t\r\n\xef\xbb\xbf')
+            if stripped:
+                return stripped[:1].decode('ascii', 'replace')
+
+def read_json_file(file_name, progress):
+    # Arquivos pequenos ou que não são um array: leitura direta (com orjson, se houver)
+    if os.path.getsize(file_name) <= JSON_STREAM_THRESHOLD or first_json_char(file_name) != '[':
+        with open_with_progress(file_name, progress) as f:
+            json_data = json_loads()(f.read())
+        
+        # Handle both list of objects and single object
+        if isinstance(json_data, list):
+            return pd.json_normalize(json_data)
+        return pd.json_normalize([json_data])
+    
+    # Arrays grandes: leitura em fluxo (ijson, se instalado) e normalização em lotes
+    if module_available("ijson"):
+        import ijson
+        with open_with_progress(file_name, progress) as f:
+            return normalize_json_batches(ijson.items(f, 'item', use_float=True))
+    with open_with_progress(file_name, progress, encoding='utf-8-sig') as f:
+        return normalize_json_batches(iter_json_array(f))
+
+def read_jsonl_file(file_name, progress):
+    # JSON Lines / NDJSON: um registro por linha
+    loads = json_loads()
+    with open_with_progress(file_name, progress) as f:
+        return normalize_json_batches(loads(line) for line in f if line.strip())
+
+def write_jsonl_file(df, file_name, progress):
+    total = len(df)
+    with open(file_name, 'w', encoding='utf-8') as f:
+        for start in range(0, total, JSON_BATCH_ROWS):
+            lines = df.iloc[start:start + JSON_BATCH_ROWS].to_json(orient='records', lines=True,
+                                                                   force_ascii=False, date_format='iso')
+            f.write(lines if lines.endswith('\n') else lines + '\n')
+            progress(min(start + JSON_BATCH_ROWS, total), total)
+
+def write_jsonl_frames(frames, file_name, progress, total):
+    done = 0
+    with open(file_name, 'w', encoding='utf-8') as f:
+        for df in frames:
+            if len(df):
+                lines = df.to_json(orient='records', lines=True, force_ascii=False,
+                                   date_format='iso')
+                f.write(lines if lines.endswith('\n') else lines + '\n')
+            done += len(df)
+            progress(done, total)
+
+def write_json_file(df, file_name, progress):
+    df.to_json(file_name, orient='records', lines=False)
+    progress(1, 1)
+
+def read_xml_file(file_name, progress):
+    import xml.etree.ElementTree as ET
+    
+    # Leitura em fluxo: cada <record> vai direto para os buffers de coluna e é
+    # descartado em seguida, então a árvore inteira nunca fica na memória
+    frames = []
+    columns = {}  # tag -> valores do lote atual
+    rows = 0
+    depth = 0
+    root = None
+    with open_with_progress(file_name, progress) as f:
+        for event, element in ET.iterparse(f, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = element
+                depth += 1
+                continue
+            
+            depth -= 1
+            if depth != 1:
+                continue
+            
+            # Fim de um registro (filho direto da raiz)
+            row = {child.tag: child.text for child in element}
+            for tag in row:
+                if tag not in columns:
+                    columns[tag] = [None] * rows
+            for tag, values in columns.items():
+                values.append(row.get(tag))
+            rows += 1
+            
+            element.clear()
+            root.clear()
+            
+            # Converte o lote em DataFrame para liberar os objetos do parser
+            if rows == XML_BATCH_ROWS:
+                frames.append(pd.DataFrame(columns))
+                columns = {tag: [] for tag in columns}
+                rows = 0
+    
+    if rows or not frames:
+        frames.append(pd.DataFrame(columns))
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
+
+def write_xml_file(df, file_name, progress):
+    # Escrita em fluxo: o documento é gerado lote a lote direto no arquivo,
+    # com o escape feito de uma vez por coluna
+    total = len(df)
+    tags = [str(column) for column in df.columns]
+    with open(file_name, 'w', encoding='utf-8', buffering=1024 * 1024) as f:
+        f.write("<?xml version='1.0' encoding='utf-8'?>\n<root>")
+        for start in range(0, total, XML_BATCH_ROWS):
+            batch = df.iloc[start:start + XML_BATCH_ROWS]
+            records = "<record>"
+            for position, tag in enumerate(tags):
+                # str() por célula: o astype(str) do NumPy daria a todas as linhas do
+                # lote a largura da célula mais longa
+                text = pd.Series(list(map(str, batch.iloc[:, position].to_numpy(dtype=object))),
+                                 dtype=object)
+                text = (text.str.replace('&', '&amp;', regex=False)
+                            .str.replace('<', '&lt;', regex=False)
+                            .str.replace('>', '&gt;', regex=False))
+                records = records + f"<{tag}>" + text + f"</{tag}>"
+            if tags:
+                f.write("".join((records + "</record>").tolist()))
+            else:
+                f.write("<record />" * len(batch))
+            progress(min(start + XML_BATCH_ROWS, total), total)
+        f.write("</root>")
+    progress(total, total)
+
+def yaml_loader():
+    # Loader em C (LibYAML) quando disponível; o SafeLoader puro Python é bem mais lento
+    import yaml
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+@lru_cache(maxsize=None)
+def yaml_dumper():
+    import datetime
+    import yaml
+    
+    class DataFrameDumper(getattr(yaml, "CSafeDumper", yaml.SafeDumper)):
+        pass
+    
+    def represent_datetime(dumper, value):
+        # pd.NaT também é um datetime, mas "!!timestamp NaT" não pode ser lido de volta
+        if pd.isna(value):
+            return dumper.represent_none(None)
+        return dumper.represent_datetime(value)
+    
+    # Tipos do pandas/NumPy viram tipos nativos que o dumper seguro conhece
+    DataFrameDumper.add_multi_representer(datetime.datetime, represent_datetime)
+    DataFrameDumper.add_multi_representer(
+        np.datetime64, lambda dumper, value: represent_datetime(dumper, pd.Timestamp(value)))
+    DataFrameDumper.add_multi_representer(
+        np.generic, lambda dumper, value: dumper.represent_data(value.item()))
+    # Células com o mesmo objeto (ex.: NaT) não viram âncoras &id001 / *id001
+    DataFrameDumper.ignore_aliases = lambda dumper, data: True
+    return DataFrameDumper
+
+def is_yaml_sequence_item(line):
+    return line.startswith('- ') or line.rstrip('\r\n') == '-'
+
+def iter_yaml_chunks(stream):
+    # Divide o texto em trechos que podem ser carregados de forma independente:
+    # cada documento (---) e, quando o documento é uma lista em bloco, lotes de
+    # YAML_BATCH_ROWS itens (linhas "- " na coluna 0)
+    lines = []
+    has_content = False
+    sequence = None
+    items = 0
+    for line in stream:
+        if line.startswith('...') and line[3:4] in ('', ' ', '\t', '\r', '\n'):
+            # Fim de documento: o marcador fecha o trecho atual (um trecho que começasse
+            # com "..." não seria YAML válido)
+            lines.append(line)
+            if has_content:
+                yield ''.join(lines)
+            lines = []
+            has_content = False
+            sequence = None
+            items = 0
+            continue
+        if line.startswith('---') and line[3:4] in ('', ' ', '\t', '\r', '\n'):
+            if has_content:
+                yield ''.join(lines)
+                lines = []
+            lines.append(line)
+            has_content = bool(line[3:].strip())
+            sequence = None
+            items = 0
+            continue
+        
+        if line.strip() and not line.startswith(('#', '%')):
+            if sequence is None:
+                sequence = is_yaml_sequence_item(line)
+            has_content = True
+        if sequence and is_yaml_sequence_item(line):
+            if items == YAML_BATCH_ROWS:
+                yield ''.join(lines)
+                lines = []
+                items = 0
+            items += 1
+        lines.append(line)
+    if has_content:
+        yield ''.join(lines)
+
+def yaml_records(documents):
+    for yaml_data in documents:
+        if yaml_data is None:
+            continue
+        if isinstance(yaml_data, list):
+            yield yaml_data
+        else:
+            yield [yaml_data]
+
+def read_yaml_file(file_name, progress):
+    import yaml
+    loader = yaml_loader()
+    
+    with open_with_progress(file_name, progress, encoding='utf-8') as f:
+        try:
+            # Modo em fluxo: cada trecho vira um DataFrame, sem montar o documento inteiro
+            frames = [pd.DataFrame(records) for records in
+                      yaml_records(yaml.load(chunk, Loader=loader) for chunk in iter_yaml_chunks(f))]
+        except yaml.YAMLError:
+            # Âncoras e aliases que atravessam lotes: carrega os documentos inteiros
+            f.seek(0)
+            frames = [pd.DataFrame(records) for records in yaml_records(yaml.load_all(f, Loader=loader))]
+    
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
+
+def write_yaml_file(df, file_name, progress):
+    import yaml
+    dumper = yaml_dumper()
+    
+    # Cada lote é uma continuação da mesma lista em bloco
+    total = len(df)
+    with open(file_name, 'w', encoding='utf-8') as f:
+        if total == 0:
+            yaml.dump([], f, Dumper=dumper)
+        for start in range(0, total, YAML_BATCH_ROWS):
+            yaml.dump(df.iloc[start:start + YAML_BATCH_ROWS].to_dict('records'), f, Dumper=dumper)
+            progress(min(start + YAML_BATCH_ROWS, total), total)
+
+def bson_codec():
+    # pymongo expõe bson.decode/encode; o pacote 'bson' avulso usa loads/dumps
+    import bson
+    if hasattr(bson, "decode") and hasattr(bson, "encode"):
+        return bson.decode, bson.encode
+    return bson.loads, bson.dumps
+
+def read_bson_file(file_name, progress):
+    import mmap
+    decode, _ = bson_codec()
+    
+    size = os.path.getsize(file_name)
+    if size == 0:
+        return pd.DataFrame()
+    
+    # Um dump do mongodump é uma sequência de documentos, cada um começando pelo
+    # próprio tamanho (int32 little-endian): percorre o arquivo mapeado em memória
+    frames = []
+    batch = []
+    pos = 0
+    with open(file_name, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        while pos < size:
+            length = int.from_bytes(data[pos:pos + 4], 'little')
+            if length < 5 or pos + length > size:
+                raise ValueError(f"Arquivo BSON corrompido na posição {pos}")
+            batch.append(decode(data[pos:pos + length]))
+            pos += length
+            if len(batch) == BSON_BATCH_ROWS:
+                frames.append(pd.DataFrame(batch))
+                batch = []
+                progress(pos, size)
+    
+    if batch or not frames:
+        frames.append(pd.DataFrame(batch))
+    progress(size, size)
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
+
+def write_bson_file(df, file_name, progress):
+    _, encode = bson_codec()
+    
+    # Um documento por linha, no mesmo formato do mongodump
+    total = len(df)
+    with open(file_name, 'wb') as f:
+        for start in range(0, total, BSON_BATCH_ROWS):
+            records = df.iloc[start:start + BSON_BATCH_ROWS].to_dict('records')
+            f.write(b"".join(encode({str(key): value for key, value in record.items()}) for record in records))
+            progress(min(start + BSON_BATCH_ROWS, total), total)
+
+def read_parquet_file(file_name, progress, columns=None):
+    progress(0, 1)
+    return pd.read_parquet(file_name, columns=columns)
+
+def sniff_parquet_file(file_name):
+    import pyarrow.parquet as pq
+    return list(pq.ParquetFile(file_name).schema_arrow.names)
+
+def write_parquet_file(df, file_name, progress):
+    df.to_parquet(file_name, index=False)
+    progress(1, 1)
+
+def create_sql_engine(target):
+    if not module_available("sqlalchemy"):
+        raise ImportError("Biblioteca 'sqlalchemy' não instalada. Use: pip install sqlalchemy")
+    from sqlalchemy import create_engine
+    
+    # pre_ping testa a conexão antes de usá-la; recycle descarta as paradas há muito tempo
+    options = dict(pool_size=SQL_POOL_MAX_SIZE, pool_pre_ping=True, pool_recycle=SQL_POOL_IDLE_SECONDS)
+    db_type = target['db_type']
+    credentials = f"{target['user']}:{target['password']}@{target['host']}/{target['database']}"
+    if db_type == "PostgreSQL":
+        if not module_available("psycopg2"):
+            raise ImportError("Biblioteca 'psycopg2' não instalada. Use: pip install psycopg2-binary")
+        return create_engine(f"postgresql://{credentials}", **options)
+    elif db_type == "MySQL/MariaDB":
+        if not module_available("mysql.connector"):
+            raise ImportError("Biblioteca 'mysql-connector-python' não instalada. Use: pip install mysql-connector-python")
+        return create_engine(f"mysql+mysqlconnector://{credentials}", **options)
+    return create_engine(f"mssql+pymssql://{credentials}", **options)
+
+def connect_sql_database(target):
+    db_type = target['db_type']
+    if db_type == "PostgreSQL":
+        if not module_available("psycopg2"):
+            raise ImportError("Biblioteca 'psycopg2' não instalada. Use: pip install psycopg2-binary")
+        import psycopg2
+        return psycopg2.connect(
+            host=target['host'],
+            user=target['user'],
+            password=target['password'],
+            database=target['database']
+        )
+    elif db_type == "MySQL/MariaDB":
+        if not module_available("mysql.connector"):
+            raise ImportError("Biblioteca 'mysql-connector-python' não instalada. Use: pip install mysql-connector-python")
+        import mysql.connector
+        return mysql.connector.connect(
+            host=target['host'],
+            user=target['user'],
+            password=target['password'],
+            database=target['database']
+        )
+    raise ValueError(f"Conexão com {db_type} ainda não suportada")
+
+def sql_profile(target):
+    # Conexões só são reaproveitadas entre alvos com o mesmo servidor, base e credenciais
+    return (target['db_type'], target['host'], target['user'], target['password'], target['database'])
+
+def sql_connection_alive(conn):
+    try:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+        finally:
+            cursor.close()
+        return True
+    except Exception:
+        return False
+
+class ConnectionPool:
+    # Conexões de um perfil mantidas abertas durante a sessão: navegar, atualizar
+    # e salvar de novo no mesmo servidor não repete TCP, TLS e autenticação
+    def __init__(self, target, max_size=SQL_POOL_MAX_SIZE, idle_seconds=SQL_POOL_IDLE_SECONDS):
+        self.target = dict(target)
+        self.max_size = max_size
+        self.idle_seconds = idle_seconds
+        self._idle = []  # (conexão, instante em que foi devolvida)
+        self._in_use = 0
+        self._condition = threading.Condition()
+        
+    def _evict_idle(self, now):
+        # Fecha as conexões paradas há mais tempo que o limite (chamado com o lock)
+        expired = [conn for conn, released in self._idle if now - released > self.idle_seconds]
+        self._idle = [(conn, released) for conn, released in self._idle if now - released <= self.idle_seconds]
+        for conn in expired:
+            self._close(conn)
+            
+    def _close(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+            
+    def evict_idle(self):
+        with self._condition:
+            self._evict_idle(time.monotonic())
+            
+    def acquire(self, timeout=SQL_POOL_TIMEOUT_SECONDS):
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._evict_idle(now)
+                while self._idle:
+                    conn, released = self._idle.pop()
+                    # Conexão parada por um tempo: verifica se o servidor ainda a mantém
+                    if now - released < SQL_POOL_PING_SECONDS or sql_connection_alive(conn):
+                        self._in_use += 1
+                        return conn
+                    self._close(conn)
+                if self._in_use < self.max_size:
+                    self._in_use += 1
+                    break
+                if not self._condition.wait(timeout):
+                    raise TimeoutError("Todas as conexões com o banco de dados estão em uso.")
+        try:
+            return connect_sql_database(self.target)
+        except BaseException:
+            with self._condition:
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+            
+    def release(self, conn, reusable=True):
+        if reusable:
+            try:
+                # Encerra a transação aberta pela consulta antes de devolver ao pool
+                conn.rollback()
+            except Exception:
+                reusable = False
+        with self._condition:
+            self._in_use -= 1
+            if reusable:
+                self._idle.append((conn, time.monotonic()))
+            self._evict_idle(time.monotonic())
+            self._condition.notify()
+        if not reusable:
+            self._close(conn)
+            
+    def close(self):
+        with self._condition:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._close(conn)
+
+SQL_POOLS = {}
+SQL_ENGINES = {}
+SQL_POOLS_LOCK = threading.Lock()
+
+@contextmanager
+def sql_connection(target):
+    with SQL_POOLS_LOCK:
+        pool = SQL_POOLS.get(sql_profile(target))
+        if pool is None:
+            pool = SQL_POOLS[sql_profile(target)] = ConnectionPool(target)
+    conn = pool.acquire()
+    try:
+        yield conn
+    except BaseException:
+        # Erro ou cancelamento no meio da leitura: a conexão pode ter resultados pendentes
+        pool.release(conn, reusable=False)
+        raise
+    else:
+        pool.release(conn)
+
+def sql_engine(target):
+    # O engine do SQLAlchemy já tem seu próprio pool; basta não recriá-lo a cada gravação
+    with SQL_POOLS_LOCK:
+        engine = SQL_ENGINES.get(sql_profile(target))
+        if engine is None:
+            engine = SQL_ENGINES[sql_profile(target)] = create_sql_engine(target)
+        return engine
+
+def sweep_sql_pools():
+    # Chamado por um timer: sem ele, as conexões ociosas só seriam fechadas na
+    # próxima vez que o pool fosse usado
+    with SQL_POOLS_LOCK:
+        pools = list(SQL_POOLS.values())
+    for pool in pools:
+        pool.evict_idle()
+
+def close_sql_pools():
+    with SQL_POOLS_LOCK:
+        pools, engines = list(SQL_POOLS.values()), list(SQL_ENGINES.values())
+        SQL_POOLS.clear()
+        SQL_ENGINES.clear()
+    for pool in pools:
+        pool.close()
+    for engine in engines:
+        engine.dispose()
+
+def split_table_name(table):
+    schema, _, name = table.rpartition('.')
+    return (schema.strip('"`') or None), name.strip('"`')
+
+def sql_primary_key(conn, target):
+    # Colunas da chave primária, na ordem da chave ([] se a tabela não tiver)
+    schema, name = split_table_name(target['table'])
+    cursor = conn.cursor()
+    try:
+        if target['db_type'] == "PostgreSQL":
+            cursor.execute(
+                "SELECT a.attname FROM pg_index i JOIN pg_attribute a "
+                "ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey) "
+                "WHERE i.indrelid = %s::regclass AND i.indisprimary "
+                "ORDER BY array_position(i.indkey::int2[], a.attnum)", (target['table'],))
+        else:
+            cursor.execute(
+                "SELECT COLUMN_NAME FROM information_schema.KEY_COLUMN_USAGE "
+                "WHERE TABLE_SCHEMA = COALESCE(%s, DATABASE()) AND TABLE_NAME = %s "
+                "AND CONSTRAINT_NAME = 'PRIMARY' ORDER BY ORDINAL_POSITION", (schema, name))
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+def sql_row_estimate(conn, target):
+    # Estimativa das estatísticas do catálogo, sem varrer a tabela; None se não houver
+    schema, name = split_table_name(target['table'])
+    cursor = conn.cursor()
+    try:
+        if target['db_type'] == "PostgreSQL":
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                           (target['table'],))
+        else:
+            cursor.execute("SELECT TABLE_ROWS FROM information_schema.TABLES "
+                           "WHERE TABLE_SCHEMA = COALESCE(%s, DATABASE()) AND TABLE_NAME = %s",
+                           (schema, name))
+        row = cursor.fetchone()
+        # reltuples = -1: tabela nunca analisada
+        return int(row[0]) if row and row[0] is not None and row[0] >= 0 else None
+    finally:
+        cursor.close()
+
+class RemoteSQLTableSource:
+    # Tabela de um servidor SQL lida por páginas conforme a rolagem, com paginação
+    # keyset pela chave primária (WHERE chave > ? ORDER BY chave LIMIT ?). A contagem
+    # vem das estatísticas do catálogo e é corrigida quando o fim da tabela é lido.
+    # Filtro e ordenação viram WHERE/ORDER BY no servidor; ordenada por outra coluna,
+    # a tabela é paginada com LIMIT/OFFSET
+    keyed = True
+    remote = True
+    can_query = True
+    
+    def __init__(self, target, columns, primary_key, row_count, block_rows=SQL_PAGE_ROWS):
+        self.target = dict(target)
+        self.columns = columns
+        self.block_rows = block_rows
+        self._total = row_count
+        # Contagem exata, obtida só quando a estimativa se mostra alta demais
+        self.exact_row_count = None
+        self._key_positions = [columns.index(column) for column in primary_key]
+        self._postgres = target['db_type'] == "PostgreSQL"
+        quoted = [quote_sql_identifier(column, target['db_type']) for column in primary_key]
+        self._key = "(" + ", ".join(quoted) + ")"
+        self._order = ", ".join(quoted)
+        self._placeholders = "(" + ", ".join(["%s"] * len(primary_key)) + ")"
+        # bloco -> chave do último registro do bloco
+        self._bounds = {}
+        self._lock = threading.Lock()
+        self._where = ""
+        self._params = ()
+        self._sort = None  # (coluna, decrescente)
+        
+    @property
+    def row_count(self):
+        # Com filtro ativo a contagem fica desconhecida; o modelo busca páginas
+        # até a consulta se esgotar em vez de rodar um COUNT(*) filtrado
+        return None if self._where else self._total
+        
+    @row_count.setter
+    def row_count(self, value):
+        self._total = value
+        
+    @property
+    def block_count(self):
+        if self.row_count is None:
+            return None
+        return -(-self.row_count // self.block_rows)
+        
+    def locate(self, row):
+        return row // self.block_rows, row % self.block_rows
+        
+    def block_start(self, block):
+        return block * self.block_rows
+        
+    def set_filter(self, text):
+        # Mesma linguagem do filtro em memória, traduzida para WHERE no servidor
+        with self._lock:
+            self._bounds.clear()
+        if not text:
+            self._where, self._params = "", ()
+            return
+        query, _ = filter_query(text, self.columns)
+        where, params = self._condition(query)
+        self._where, self._params = where, tuple(params)
+        
+    def _quote(self, column):
+        return quote_sql_identifier(column, self.target['db_type'])
+        
+    def _like(self, column):
+        # "Contém" sem diferenciar maiúsculas: ILIKE sobre o texto da coluna no
+        # PostgreSQL; no MySQL o LIKE já segue a colação da coluna (\ é o escape padrão)
+        if self._postgres:
+            return f"CAST({column} AS TEXT) ILIKE %s"
+        return f"{column} LIKE %s"
+        
+    def _value(self, value):
+        # No PostgreSQL o valor vai como texto e o servidor o converte para o tipo da
+        # coluna (id = '5', data >= '2020-01-01'); um número contra texto seria um erro
+        return str(value) if self._postgres else value
+        
+    def _condition(self, node):
+        # Mesma tradução de SQLiteTableSource._condition, com o marcador %s e as
+        # aspas do servidor; NULL conta como "diferente" e "não contém"
+        kind = node[0]
+        if kind == 'text':
+            pattern = sql_like_pattern(node[1])
+            terms = [self._like(self._quote(column)) for column in self.columns]
+            return "(" + " OR ".join(terms) + ")", [pattern] * len(terms)
+        if kind == 'not':
+            sql, params = self._condition(node[1])
+            return f"NOT COALESCE({sql}, FALSE)", params
+        if kind in ('and', 'or'):
+            left, left_params = self._condition(node[1])
+            right, right_params = self._condition(node[2])
+            return f"({left} {kind.upper()} {right})", left_params + right_params
+        _, col, op, value = node
+        column = self._quote(self.columns[col])
+        if value is None:
+            return f"{column} IS {'NOT ' if op == '!=' else ''}NULL", []
+        if op in ('~', '!~'):
+            like = self._like(column)
+            if op == '!~':
+                like = f"({column} IS NULL OR NOT {like})"
+            return like, [sql_like_pattern(str(value))]
+        if op == '!=':
+            return f"({column} IS NULL OR {column} <> %s)", [self._value(value)]
+        return f"{column} {'=' if op == '==' else op} %s", [self._value(value)]
+        
+    def set_sort(self, column, descending=False):
+        with self._lock:
+            self._bounds.clear()
+        self._sort = None if column is None else (self.columns[column], descending)
+        
+    def _order_by(self):
+        if not self._sort:
+            return self._order
+        column, descending = self._sort
+        return self._quote(column) + (" DESC" if descending else "") + ", " + self._order
+        
+    def _fetch(self, query, params):
+        with sql_connection(self.target) as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, params)
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+                
+    def _select(self, select, conditions, params, limit, offset=0, query=True):
+        # SELECT com o filtro da vista (se query) e as condições de paginação
+        if query and self._where:
+            conditions = [self._where] + conditions
+            params = self._params + params
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        order = self._order_by() if query else self._order
+        suffix = " OFFSET %s" if offset else ""
+        return self._fetch(f"SELECT {select} FROM {self.target['table']}{where} ORDER BY {order} "
+                           f"LIMIT %s{suffix}", params + (limit,) + ((offset,) if offset else ()))
+                           
+    def _bound(self, block):
+        with self._lock:
+            if block in self._bounds:
+                return self._bounds[block]
+        # Bloco anterior ainda não lido: busca a chave só pelo índice da chave primária
+        rows = self._select(self._order, [], (), 1, (block + 1) * self.block_rows - 1)
+        bound = tuple(rows[0]) if rows else None
+        with self._lock:
+            self._bounds[block] = bound
+        return bound
+        
+    def _frame(self, rows):
+        keys = [tuple(row[position] for position in self._key_positions) for row in rows]
+        if len(self._key_positions) == 1:
+            index = pd.Index([key[0] for key in keys])
+        else:
+            index = pd.Index(keys, tupleize_cols=False)
+        return pd.DataFrame.from_records(rows, columns=self.columns, index=index, coerce_float=True), keys
+        
+    def _page(self, bound, query=True):
+        if bound is None:
+            return self._select("*", [], (), self.block_rows, query=query)
+        return self._select("*", [f"{self._key} > {self._placeholders}"], bound, self.block_rows,
+                            query=query)
+        
+    def read_block(self, block):
+        # Chamado em uma thread de trabalho; cada leitura usa uma conexão do pool
+        if self._sort:
+            rows = self._select("*", [], (), self.block_rows, block * self.block_rows)
+        elif block == 0:
+            rows = self._page(None)
+        else:
+            bound = self._bound(block - 1)
+            if bound is None:
+                if self._where:
+                    return pd.DataFrame(columns=self.columns)
+                # Bloco além do fim real: a estimativa do catálogo estava alta
+                self.exact_row_count = self._fetch(f"SELECT COUNT(*) FROM {self.target['table']}", ())[0][0]
+                return pd.DataFrame(columns=self.columns)
+            rows = self._page(bound)
+        df, keys = self._frame(rows)
+        if keys and not self._sort:
+            with self._lock:
+                self._bounds[block] = keys[-1]
+        return df
+        
+    def iter_frames(self):
+        # Tabela inteira em ordem de chave, sem o filtro da vista (para salvar em outro formato)
+        bound = None
+        while True:
+            rows = self._page(bound, query=False)
+            if not rows:
+                break
+            df, keys = self._frame(rows)
+            yield df
+            if len(rows) < self.block_rows:
+                break
+            bound = keys[-1]
+
+def open_sql_table(target, progress):
+    # Tabelas com chave primária são paginadas sob demanda; sem chave, None
+    with sql_connection(target) as conn:
+        primary_key = sql_primary_key(conn, target)
+        if not primary_key:
+            return None
+        progress(1, 3)
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"SELECT * FROM {target['table']} LIMIT 0")
+            columns = [description[0] for description in cursor.description]
+            cursor.fetchall()
+        finally:
+            cursor.close()
+        progress(2, 3)
+        row_count = sql_row_estimate(conn, target)
+        if row_count is None or row_count < SQL_PAGE_ROWS:
+            # Sem estatísticas ou tabela pequena: a contagem exata é barata o bastante
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"SELECT COUNT(*) FROM {target['table']}")
+                row_count = cursor.fetchone()[0]
+            finally:
+                cursor.close()
+    return RemoteSQLTableSource(target, columns, primary_key, row_count)
+
+def open_sql_cursor(conn, target):
+    # Cursor do lado do servidor: as linhas chegam em lotes em vez de todas de uma vez
+    if target['db_type'] == "PostgreSQL":
+        cursor = conn.cursor(name="bananapp_stream")
+        cursor.itersize = SQL_FETCH_ROWS
+        return cursor
+    return conn.cursor(buffered=False)
+
+def read_sql_table(target, progress, deliver=None):
+    # Com chave primária a tabela inteira é paginada sob demanda, sem limite;
+    # sem chave, as primeiras 'limit' linhas são lidas em fluxo
+    source = open_sql_table(target, progress)
+    if source is not None:
+        return source
+    progress(0, target['limit'])
+    with sql_connection(target) as conn:
+        cursor = open_sql_cursor(conn, target)
+        try:
+            # Executar consulta
+            cursor.execute(f"SELECT * FROM {target['table']} LIMIT {int(target['limit'])}")
+            frames, columns, count = [], None, 0
+            while True:
+                rows = cursor.fetchmany(SQL_FETCH_ROWS)
+                if columns is None:
+                    # Em cursores nomeados a descrição só existe depois do primeiro fetch
+                    columns = [description[0] for description in cursor.description]
+                if not rows and count:
+                    break
+                frame = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+                count += len(frame)
+                if deliver is not None:
+                    deliver(frame)
+                else:
+                    frames.append(frame)
+                progress(count, target['limit'])
+                if len(rows) < SQL_FETCH_ROWS:
+                    break
+        finally:
+            try:
+                cursor.close()
+            except Exception:
+                pass  # cursor sem leitura até o fim (cancelado); a conexão é descartada
+    if deliver is not None:
+        return count
+    return pd.concat(frames, ignore_index=True)
+
+def quote_sql_identifier(name, db_type):
+    quote = '`' if db_type == "MySQL/MariaDB" else '"'
+    return quote + str(name).replace(quote, quote * 2) + quote
+
+def copy_csv_text(chunk):
+    # CSV do COPY com todo valor entre aspas e NULL como campo vazio sem aspas (o
+    # padrão do PostgreSQL): um texto vazio ou igual a \N nunca se confunde com NULL
+    fields = []
+    for _, column in chunk.items():
+        text = column.astype(str).str.replace('"', '""', regex=False)
+        fields.append(('"' + text + '"').where(column.notna(), ''))
+    if not fields or len(chunk) == 0:
+        return ''
+    return '\n'.join(fields[0].str.cat(fields[1:], sep=',').tolist()) + '\n'
+
+def copy_to_postgres(conn, df, table, progress):
+    # COPY FROM STDIN alimentado por CSV em memória, um bloco por vez
+    columns = ", ".join(quote_sql_identifier(column, "PostgreSQL") for column in df.columns)
+    statement = f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)"
+    cursor = conn.cursor()
+    try:
+        for start in range(0, len(df), SQL_COPY_ROWS):
+            chunk = df.iloc[start:start + SQL_COPY_ROWS]
+            cursor.copy_expert(statement, io.StringIO(copy_csv_text(chunk)))
+            progress(start + len(chunk), len(df))
+    finally:
+        cursor.close()
+
+def insert_multirow(conn, df, table, progress, quote_type="MySQL/MariaDB", placeholder="%s",
+                    batch_rows=None):
+    # INSERT ... VALUES (...), (...), ... com batch_rows linhas por comando
+    batch_rows = batch_rows or SQL_INSERT_BATCH_ROWS
+    columns = ", ".join(quote_sql_identifier(column, quote_type) for column in df.columns)
+    row_placeholders = "(" + ", ".join([placeholder] * len(df.columns)) + ")"
+    statement = None
+    statement_rows = 0  # linhas para as quais o comando em cache foi montado
+    cursor = conn.cursor()
+    try:
+        for start in range(0, len(df), SQL_COPY_ROWS):
+            chunk = df.iloc[start:start + SQL_COPY_ROWS]
+            rows = list(sql_rows(chunk))
+            for offset in range(0, len(rows), batch_rows):
+                batch = rows[offset:offset + batch_rows]
+                if len(batch) != statement_rows:
+                    statement = (f"INSERT INTO {table} ({columns}) VALUES "
+                                 + ", ".join([row_placeholders] * len(batch)))
+                    statement_rows = len(batch)
+                cursor.execute(statement, [value for row in batch for value in row])
+            progress(start + len(chunk), len(df))
+    finally:
+        cursor.close()
+
+def write_sql_table(df, target, progress):
+    engine = sql_engine(target)
+    db_type = target['db_type']
+    if db_type not in ("PostgreSQL", "MySQL/MariaDB"):
+        df.to_sql(target['table'], engine, if_exists=target['if_exists'], index=False)
+        progress(1, 1)
+        return
+    
+    # O pandas/SQLAlchemy só cria a tabela com os tipos certos; as linhas vão pelo
+    # caminho de carga em massa do servidor. Para substituir, a carga vai para uma
+    # tabela ao lado que só toma o lugar da antiga no fim: erro ou cancelamento no
+    # meio da carga deixam a tabela original intacta
+    replace = target['if_exists'] == 'replace'
+    name = target['table'] + SQL_STAGING_SUFFIX if replace else target['table']
+    df.head(0).to_sql(name, engine, if_exists=target['if_exists'], index=False)
+    table = quote_sql_identifier(name, db_type)
+    try:
+        with sql_connection(target) as conn:
+            if db_type == "PostgreSQL":
+                copy_to_postgres(conn, df, table, progress)
+            else:
+                insert_multirow(conn, df, table, progress, batch_rows=target.get('batch_rows'))
+            if replace:
+                swap_sql_table(conn, target, table)
+            conn.commit()
+    except BaseException:
+        if replace:
+            drop_sql_table(target, table)
+        raise
+    progress(len(df), len(df))
+
+def swap_sql_table(conn, target, staging):
+    # Troca a tabela de carga pela tabela de destino. No PostgreSQL o DDL faz parte
+    # da transação; no MySQL um único RENAME TABLE troca as duas de forma atômica
+    db_type = target['db_type']
+    table = quote_sql_identifier(target['table'], db_type)
+    cursor = conn.cursor()
+    try:
+        if db_type == "PostgreSQL":
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+            cursor.execute(f"ALTER TABLE {staging} RENAME TO {table}")
+        else:
+            replaced = quote_sql_identifier(target['table'] + SQL_REPLACED_SUFFIX, db_type)
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {table} LIKE {staging}")
+            cursor.execute(f"DROP TABLE IF EXISTS {replaced}")
+            cursor.execute(f"RENAME TABLE {table} TO {replaced}, {staging} TO {table}")
+            cursor.execute(f"DROP TABLE {replaced}")
+    finally:
+        cursor.close()
+
+def drop_sql_table(target, table):
+    # Limpeza depois de uma carga que falhou; um erro aqui não esconde o erro original
+    try:
+        with sql_connection(target) as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"DROP TABLE IF EXISTS {table}")
+            finally:
+                cursor.close()
+            conn.commit()
+    except Exception:
+        pass
+
+class FileFormat:
+    # Plugin de formato: o leitor e o escritor importam suas bibliotecas apenas
+    # quando usados, e as capacidades dizem quais caminhos rápidos existem
+    def __init__(self, name, extensions=(), reader=None, writer=None, requires=(),
+                 sniffer=None, block_source=None, options_dialog=None, save_options_dialog=None,
+                 streaming_read=False, progress=False, install_hint=None, writes_in_place=False,
+                 frame_writer=None):
+        self.name = name
+        self.extensions = tuple(extensions)
+        self.reader = reader
+        self.writer = writer
+        self.requires = tuple(requires)
+        self.sniffer = sniffer
+        self.block_source = block_source
+        # Função (janela, arquivo) -> opções de leitura, ou None se o usuário cancelar
+        self.options_dialog = options_dialog
+        # Função (janela, arquivo, colunas) -> opções de escrita, ou None se cancelar
+        self.save_options_dialog = save_options_dialog
+        # Leitor aceita deliver= e entrega lotes parciais enquanto lê (a tabela aparece
+        # conforme chega)
+        self.streaming_read = streaming_read
+        # Leitor e escritor informam o progresso em etapas; sem isso a barra fica ocupada
+        self.progress = progress
+        self.install_hint = install_hint
+        # Escritor que grava dentro do arquivo existente (SQLite: uma tabela, em transação)
+        self.writes_in_place = writes_in_place
+        # Função (blocos, arquivo, progress, total) que grava a tabela bloco a bloco
+        self.frame_writer = frame_writer
+        
+    @property
+    def schema_sniffing(self):
+        return self.sniffer is not None
+        
+    @property
+    def chunked_write(self):
+        # Grava uma tabela em janela bloco a bloco, sem montá-la em memória
+        return self.frame_writer is not None
+        
+    @property
+    def file_based(self):
+        return bool(self.extensions)
+        
+    def available(self):
+        return all(module_available(module) for module in self.requires)
+        
+    def read(self, file_name, progress, **options):
+        return self.reader(file_name, progress, **options)
+        
+    def write(self, df, target, progress, **options):
+        return self._write_to(target, lambda path: self.writer(df, path, progress, **options))
+        
+    def write_frames(self, frames, columns, total, target, progress, **options):
+        # Tabela em janela: com gravação em blocos nada é montado em memória; sem ela
+        # a tabela é montada aqui, já na thread de trabalho
+        if self.chunked_write:
+            return self._write_to(target, lambda path: self.frame_writer(frames, path, progress, total))
+        frames = list(frames)
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+        return self.write(df, target, progress, **options)
+        
+    def _write_to(self, target, write):
+        if not self.file_based or self.writes_in_place:
+            return write(target)
+        # Grava num arquivo ao lado do destino e só troca no fim: falha ou cancelamento
+        # não deixam um arquivo pela metade nem apagam o anterior
+        folder, name = os.path.split(os.path.abspath(target))
+        root, extension = os.path.splitext(name)
+        partial = os.path.join(folder, f".{root}.parcial{extension}")
+        try:
+            result = write(partial)
+            os.replace(partial, target)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        return result
+        
+    def sniff(self, file_name):
+        return self.sniffer(file_name)
+        
+    def file_filter(self):
+        patterns = " ".join(f"*{extension}" for extension in self.extensions)
+        return f"{self.name} ({patterns})"
+
+FILE_FORMATS = OrderedDict()
+
+def register_format(file_format):
+    FILE_FORMATS[file_format.name] = file_format
+    return file_format
+
+def format_for_extension(extension):
+    for file_format in FILE_FORMATS.values():
+        if extension in file_format.extensions and file_format.reader and file_format.available():
+            return file_format
+    return None
+
+register_format(FileFormat(
+    "CSV", ['.csv'], read_csv_file, write_csv_file, sniffer=sniff_csv_file,
+    block_source=CsvBlockSource, progress=True, frame_writer=write_csv_frames))
+register_format(FileFormat(
+    "Excel", ['.xlsx', '.xls'], read_excel_file, write_excel_file, requires=['openpyxl'],
+    sniffer=sniff_excel_file, options_dialog=ask_excel_options, progress=True,
+    install_hint="Para salvar em formato Excel (.xlsx), você precisa instalar a biblioteca 'openpyxl'.\nUse o comando: pip install openpyxl"))
+register_format(FileFormat(
+    "SQLite", ['.db', '.sqlite'], read_sqlite_file, write_sqlite_file, sniffer=sniff_sqlite_file,
+    options_dialog=ask_sqlite_options, save_options_dialog=ask_sqlite_save_options,
+    progress=True, writes_in_place=True))
+register_format(FileFormat(
+    "JSON", ['.json'], read_json_file, write_json_file))
+register_format(FileFormat(
+    "JSON Lines", ['.jsonl', '.ndjson'], read_jsonl_file, write_jsonl_file, progress=True,
+    frame_writer=write_jsonl_frames))
+register_format(FileFormat(
+    "XML", ['.xml'], read_xml_file, write_xml_file, progress=True))
+register_format(FileFormat(
+    "YAML", ['.yaml', '.yml'], read_yaml_file, write_yaml_file, requires=['yaml'], progress=True,
+    install_hint="Para usar YAML, instale a biblioteca 'pyyaml'.\nUse o comando: pip install pyyaml"))
+register_format(FileFormat(
+    "BSON", ['.bson'], read_bson_file, write_bson_file, requires=['bson'], progress=True,
+    install_hint="Para usar BSON, instale a biblioteca 'bson'.\nUse o comando: pip install bson"))
+register_format(FileFormat(
+    "Parquet", ['.parquet'], read_parquet_file, write_parquet_file, requires=['pyarrow'],
+    sniffer=sniff_parquet_file, block_source=ParquetBlockSource,
+    install_hint="Para usar Parquet, instale a biblioteca 'pyarrow'.\nUse o comando: pip install pyarrow"))
+register_format(FileFormat(
+    "SQL", reader=read_sql_table, writer=write_sql_table, streaming_read=True, progress=True))
+
+def read_data_file(file_name, progress, **options):
+    # Retorna (nome, tipo de arquivo, DataFrame ou fonte em blocos para arquivos grandes)
+    extension = os.path.splitext(file_name)[1].lower()
+    file_format = format_for_extension(extension)
+    
+    if file_format is None:
+        # Extensão desconhecida: o formato é descoberto só pelo cabeçalho/esquema
+        file_format = sniff_format(file_name)
+        if file_format is None:
+            raise ValueError("Formato de arquivo não reconhecido ou não suportado.")
+    
+    # Arquivos grandes demais para a memória: abre em modo janela
+    if file_format.block_source and os.path.getsize(file_name) > LARGE_FILE_THRESHOLD:
+        return file_name, file_format.name, file_format.block_source(file_name, progress=progress)
+    return file_name, file_format.name, file_format.read(file_name, progress, **options)
+
+def sniff_format(file_name):
+    # Formatos com leitura de esquema, dos mais específicos ao CSV, que aceita quase
+    # qualquer texto; o primeiro que reconhece colunas no arquivo é o escolhido
+    candidates = [file_format for file_format in FILE_FORMATS.values()
+                  if file_format.file_based and file_format.schema_sniffing and file_format.available()]
+    candidates.sort(key=lambda file_format: file_format.name == "CSV")
+    for file_format in candidates:
+        try:
+            if file_format.sniff(file_name):
+                return file_format
+        except Exception:
+            continue
+    return None
+
+class TaskThread(QThread):
+    # Thread sem laço de eventos: roda a função e termina
+    def __init__(self, target, parent=None):
+        super().__init__(parent)
+        self._target = target
+        
+    def run(self):
+        self._target()
+
+class BackgroundTask(QObject):
+    # Executa uma função fora da thread da interface, com progresso e cancelamento.
+    # O objeto continua na thread da interface (só run() roda na thread de trabalho,
+    # e os sinais chegam aos receptores por fila). Cada tarefa fica guardada em
+    # BackgroundTask.running até a thread terminar; depois é liberada com deleteLater,
+    # também na thread da interface
+    running = set()
+    progress = Signal(object, object)
+    batch = Signal(object)
+    finished = Signal(object)
+    failed = Signal(str)
+    cancelled = Signal()
+    
+    def __init__(self, function, *args, streaming=False, **kwargs):
+        super().__init__()
+        self._function = function
+        self._args = args
+        self._kwargs = kwargs
+        if streaming:
+            # A função entrega lotes parciais por deliver(), que também é ponto de cancelamento
+            self._kwargs['deliver'] = self.deliver
+        self._cancel_requested = False
+        self._last_permille = -1
+        self._thread = None
+        
+    def start(self):
+        self._thread = TaskThread(self.run, self)
+        self._thread.finished.connect(self._release)
+        BackgroundTask.running.add(self)
+        self._thread.start()
+        
+    def _release(self):
+        BackgroundTask.running.discard(self)
+        self._function = self._args = self._kwargs = None
+        self._thread._target = None
+        self._thread = None
+        self.deleteLater()
+        
+    def wait(self):
+        # Pede o cancelamento e espera a função parar
+        self.cancel()
+        if self._thread is not None:
+            self._thread.wait()
+            
+    def cancel(self):
+        self._cancel_requested = True
+        
+    def report(self, done, total):
+        # Chamado pela função em execução; também é o ponto de cancelamento
+        if self._cancel_requested:
+            raise TaskCancelled()
+        permille = int(done * 1000 / total) if total else 0
+        if permille != self._last_permille:
+            self._last_permille = permille
+            self.progress.emit(done, total)
+            
+    def deliver(self, result):
+        if self._cancel_requested:
+            raise TaskCancelled()
+        self.batch.emit(result)
+            
+    def run(self):
+        try:
+            result = self._function(*self._args, progress=self.report, **self._kwargs)
+        except TaskCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.finished.emit(result)
+
+class RowIndexProxyModel(QAbstractProxyModel):
+    # Proxy leve: as linhas visíveis são um array de posições do modelo de origem,
+    # calculado fora do Qt (máscara do filtro combinada com a ordenação). A ordenação
+    # usa o tipo nativo das colunas (10 depois de 9) e aceita várias colunas:
+    # Shift+clique no cabeçalho acrescenta uma coluna às chaves
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._mask = None   # bool por linha da origem; None = todas visíveis
+        self._order = None  # permutação das linhas da origem; None = ordem natural
+        self._rows = None   # posições visíveis na origem; None = identidade
+        self._positions = None
+        self._sort_keys = []  # [(coluna, crescente)], da chave principal para as demais
+        # chaves -> permutação, em ordem LRU; descartadas quando os dados mudam
+        self._orders = OrderedDict()
+        
+    def setSourceModel(self, model):
+        self.beginResetModel()
+        super().setSourceModel(model)
+        model.dataChanged.connect(self._on_source_data_changed)
+        model.rowsAboutToBeInserted.connect(self._on_source_rows_about_to_be_inserted)
+        model.rowsInserted.connect(self._on_source_rows_inserted)
+        model.modelAboutToBeReset.connect(self.beginResetModel)
+        model.modelReset.connect(self._on_source_reset)
+        self._mask = self._order = self._rows = self._positions = None
+        self._sort_keys = []
+        self._orders.clear()
+        self.endResetModel()
+        
+    def _update_rows(self):
+        order = self._order
+        mask = self._mask
+        total = self.sourceModel().rowCount()
+        if mask is not None and len(mask) < total:
+            # Linhas chegaram depois do filtro: ficam ocultas até o próximo resultado
+            mask = np.concatenate([mask, np.zeros(total - len(mask), dtype=bool)])
+        if order is not None and len(order) < total:
+            order = np.concatenate([order, np.arange(len(order), total)])
+        if order is None:
+            self._rows = None if mask is None else np.flatnonzero(mask)
+        else:
+            self._rows = order if mask is None else order[mask[order]]
+        self._positions = None
+        
+    def set_mask(self, mask):
+        self.beginResetModel()
+        self._mask = mask
+        self._update_rows()
+        self.endResetModel()
+        
+    def sort(self, column, order=Qt.AscendingOrder):
+        ascending = order == Qt.AscendingOrder
+        if column < 0:
+            keys = []
+        elif QApplication.keyboardModifiers() & Qt.ShiftModifier and self._sort_keys:
+            # Shift+clique: acrescenta a coluna (ou inverte a que já é chave)
+            keys = [key for key in self._sort_keys if key[0] != column]
+            if len(keys) == len(self._sort_keys):
+                keys.append((column, ascending))
+            else:
+                keys = [(col, ascending if col == column else asc) for col, asc in self._sort_keys]
+        else:
+            keys = [(column, ascending)]
+        marked = len(keys) > 1 or len(self._sort_keys) > 1
+        self.layoutAboutToBeChanged.emit()
+        self._sort_keys = keys
+        self._order = self._sorted_order(tuple(keys)) if keys else None
+        self._update_rows()
+        self.layoutChanged.emit()
+        if marked:
+            self.headerDataChanged.emit(Qt.Horizontal, 0, self.columnCount() - 1)
+        
+    def _sorted_order(self, keys):
+        # Permutação estável pelo tipo nativo das colunas; guardada para alternar entre
+        # ordenações sem refazer o sort
+        cached = self._orders.get(keys)
+        if cached is not None:
+            self._orders.move_to_end(keys)
+            return cached
+        df = self.sourceModel().get_dataframe()
+        frame = pd.DataFrame({i: df.iloc[:, col].reset_index(drop=True)
+                              for i, (col, _) in enumerate(keys)})
+        ascending = [asc for _, asc in keys]
+        try:
+            order = stable_order(frame, ascending)
+        except TypeError:
+            # Coluna object com tipos misturados (ex.: números e textos após edições):
+            # essas colunas ordenam pelo texto exibido
+            frame = frame.apply(lambda column: column.astype(str) if column.dtype == object else column)
+            order = stable_order(frame, ascending)
+        self._orders[keys] = order
+        while len(self._orders) > SORT_CACHE_ORDERS:
+            self._orders.popitem(last=False)
+        return order
+        
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().rowCount() if self._rows is None else len(self._rows)
+        
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().columnCount()
+        
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or not (0 <= row < self.rowCount() and 0 <= column < self.columnCount()):
+            return QModelIndex()
+        return self.createIndex(row, column)
+        
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+        
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid():
+            return QModelIndex()
+        row = proxy_index.row() if self._rows is None else int(self._rows[proxy_index.row()])
+        return self.sourceModel().index(row, proxy_index.column())
+        
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        if self._rows is None:
+            return self.index(source_index.row(), source_index.column())
+        if self._positions is None:
+            self._positions = np.full(self.sourceModel().rowCount(), -1, dtype=np.int64)
+            self._positions[self._rows] = np.arange(len(self._rows))
+        row = source_index.row()
+        if row >= len(self._positions) or self._positions[row] < 0:
+            return QModelIndex()
+        return self.index(int(self._positions[row]), source_index.column())
+        
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Vertical and self._rows is not None and 0 <= section < len(self._rows):
+            section = int(self._rows[section])
+        value = self.sourceModel().headerData(section, orientation, role)
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and len(self._sort_keys) > 1:
+            # Ordenação por várias colunas: posição e sentido de cada chave no cabeçalho
+            for rank, (column, ascending) in enumerate(self._sort_keys, 1):
+                if column == section:
+                    return f"{value} ({rank}{'▲' if ascending else '▼'})"
+        return value
         
-    def rowCount(self, parent=QModelIndex()):
-        return len(self._data.index)
+    def _on_source_data_changed(self, top_left, bottom_right, roles=()):
+        self._orders.clear()
+        if self._rows is None:
+            self.dataChanged.emit(self.index(top_left.row(), top_left.column()),
+                                  self.index(bottom_right.row(), bottom_right.column()))
+        elif self.rowCount():
+            self.dataChanged.emit(self.index(0, top_left.column()),
+                                  self.index(self.rowCount() - 1, bottom_right.column()))
+                                  
+    def _on_source_rows_about_to_be_inserted(self, parent, first, last):
+        self._orders.clear()
+        if self._rows is None:
+            self.beginInsertRows(QModelIndex(), first, last)
+        else:
+            self.beginResetModel()
+            
+    def _on_source_rows_inserted(self, parent, first, last):
+        if self._rows is None:
+            self.endInsertRows()
+        else:
+            if self._sort_keys:
+                # Linhas novas (leitura em fluxo) entram na ordenação indicada no cabeçalho
+                self._order = self._sorted_order(tuple(self._sort_keys))
+            self._update_rows()
+            self.endResetModel()
+            
+    def _on_source_reset(self):
+        self._mask = self._order = self._rows = self._positions = None
+        self._sort_keys = []
+        self._orders.clear()
+        self.endResetModel()
+
+def stable_order(frame, ascending):
+    # Posições das linhas na ordem pedida; empates mantêm a ordem original
+    if frame.shape[1] == 1:
+        column = frame.iloc[:, 0]
+        if isinstance(column.dtype, np.dtype) and column.dtype.kind in 'iub' and ascending[0]:
+            # Só dtypes do NumPy (sem ausentes); Int64/boolean anuláveis vão por sort_values
+            return np.argsort(column.to_numpy(), kind='stable')
+        return column.sort_values(ascending=ascending[0], kind='stable', na_position='last').index.to_numpy()
+    return frame.sort_values(by=list(frame.columns), ascending=ascending, kind='stable',
+                             na_position='last').index.to_numpy()
+
+def text_column(column):
+    # Coluna como texto minúsculo, no formato da exibição (mesmo str() de
+    # _display_block: datas com hora, "nan", "NaT", "<NA>"); com pyarrow, buscas por
+    # substring rodam no kernel vetorizado do Arrow. A conversão é feita em blocos
+    # porque segura o GIL e congelaria a interface em colunas grandes
+    pieces = []
+    for start in range(0, len(column), FILTER_CHUNK_ROWS):
+        chunk = column.iloc[start:start + FILTER_CHUNK_ROWS]
+        # str() célula a célula em objetos: astype(str) do NumPy montaria um array de
+        # largura fixa (a da célula mais longa) para o bloco inteiro
+        text = pd.Series(list(map(str, chunk.to_numpy(dtype=object))), index=chunk.index, dtype=object)
+        if module_available("pyarrow"):
+            text = text.astype("string[pyarrow]")
+        pieces.append(text.str.lower())
+    if not pieces:
+        return column.astype(str)
+    return pd.concat(pieces) if len(pieces) > 1 else pieces[0]
+
+def trigram_codes(text):
+    # Cada trigrama vira um inteiro: três pontos de código de 21 bits
+    codes = [ord(char) for char in text]
+    return {(codes[i] << 42) | (codes[i + 1] << 21) | codes[i + 2] for i in range(len(codes) - 2)}
+
+def column_trigram_pairs(text, start):
+    # Pares (trigrama, linha) sem repetição de um bloco de texto; matriz de pontos
+    # de código (linhas x caracteres) via dtype Unicode do NumPy, sem laço por célula
+    values = np.asarray(text.to_numpy(dtype=object, na_value=""), dtype=str)
+    if values.dtype.itemsize < 12:  # menos de 3 caracteres em todas as linhas
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32)
+    chars = values.view(np.uint32).reshape(len(values), -1).astype(np.int64)
+    grams = (chars[:, :-2] << 42) | (chars[:, 1:-1] << 21) | chars[:, 2:]
+    valid = chars[:, 2:] != 0
+    rows = np.broadcast_to(np.arange(start, start + len(values), dtype=np.int32)[:, None], grams.shape)[valid]
+    grams = grams[valid]
+    order = np.lexsort((grams, rows))
+    grams, rows = grams[order], rows[order]
+    keep = np.ones(len(grams), dtype=bool)
+    keep[1:] = (grams[1:] != grams[:-1]) | (rows[1:] != rows[:-1])
+    return grams[keep], rows[keep]
+
+class TrigramIndex:
+    # Índice invertido de trigramas por coluna: trigrama -> linhas que o contêm.
+    # Uma busca por substring vira a interseção das listas dos seus trigramas,
+    # e só essas linhas são conferidas com str.contains
+    def __init__(self, row_count, columns):
+        self.row_count = row_count
+        # coluna -> (trigramas ordenados, deslocamentos, linhas, linhas longas não indexadas)
+        self.columns = columns
         
-    def columnCount(self, parent=QModelIndex()):
-        return len(self._data.columns)
+    @classmethod
+    def build(cls, text_columns, row_count, progress):
+        columns = {}
+        for col, text in text_columns.items():
+            lengths = text.str.len().to_numpy(dtype=np.int64, na_value=0)
+            if len(lengths) and lengths.mean() > INDEX_MAX_MEAN_LENGTH:
+                continue  # textos longos (descrições): o índice ficaria maior que a coluna
+            long_rows = np.flatnonzero(lengths > INDEX_MAX_LENGTH).astype(np.int32)
+            all_grams, all_rows = [], []
+            for start in range(0, len(text), INDEX_CHUNK_ROWS):
+                chunk = text.iloc[start:start + INDEX_CHUNK_ROWS]
+                short = lengths[start:start + INDEX_CHUNK_ROWS] <= INDEX_MAX_LENGTH
+                chunk_rows = np.flatnonzero(short)
+                grams, rows = column_trigram_pairs(chunk.iloc[chunk_rows], 0)
+                all_grams.append(grams)
+                all_rows.append((rows + start).astype(np.int32) if len(chunk_rows) == len(chunk)
+                                else (chunk_rows[rows] + start).astype(np.int32))
+                progress(col, len(text_columns))
+            grams = np.concatenate(all_grams) if all_grams else np.empty(0, dtype=np.int64)
+            rows = np.concatenate(all_rows) if all_rows else np.empty(0, dtype=np.int32)
+            # Ordenação estável: dentro de cada trigrama as linhas continuam crescentes
+            order = np.argsort(grams, kind='stable')
+            grams, rows = grams[order], rows[order]
+            starts = np.flatnonzero(np.r_[True, grams[1:] != grams[:-1]]) if len(grams) else np.empty(0, dtype=np.int64)
+            offsets = np.r_[starts, len(grams)].astype(np.int64)
+            columns[col] = (grams[starts], offsets, rows, long_rows)
+        return cls(row_count, columns)
         
-    def data(self, index, role=Qt.DisplayRole):
-        if not index.isValid():
+    def lookup(self, col, needle):
+        # Linhas que podem conter needle (superconjunto); None se a coluna não tem índice
+        entry = self.columns.get(col)
+        if entry is None or len(needle) < 3:
             return None
+        keys, offsets, rows, long_rows = entry
+        postings = []
+        for gram in trigram_codes(needle):
+            i = np.searchsorted(keys, gram)
+            if i == len(keys) or keys[i] != gram:
+                return long_rows
+            postings.append(rows[offsets[i]:offsets[i + 1]])
+        # Interseção a partir da lista mais curta, por busca binária nas listas
+        # ordenadas; com poucas linhas restantes a conferência final sai mais barata
+        postings.sort(key=len)
+        result = postings[0]
+        for posting in postings[1:]:
+            if len(result) <= INDEX_VERIFY_ROWS:
+                break
+            positions = np.minimum(np.searchsorted(posting, result), len(posting) - 1)
+            result = result[posting[positions] == result]
+        if len(result) > self.row_count * INDEX_MAX_FRACTION:
+            return None  # consulta pouco seletiva: varrer a coluna é mais barato que conferir
+        return np.union1d(result, long_rows) if len(long_rows) else result
+        
+    def save(self, path, signature):
+        arrays = {'signature': np.array(signature), 'row_count': np.array(self.row_count)}
+        for col, (keys, offsets, rows, long_rows) in self.columns.items():
+            arrays.update({f'{col}_keys': keys, f'{col}_offsets': offsets,
+                           f'{col}_rows': rows, f'{col}_long': long_rows})
+        with open(path, 'wb') as f:
+            np.savez(f, **arrays)
             
-        if role == Qt.DisplayRole or role == Qt.EditRole:
-            value = self._data.iloc[index.row(), index.column()]
-            return str(value)
+    @classmethod
+    def load(cls, path, signature):
+        # None se não existir ou se foi feito para outra versão do arquivo
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                if str(data['signature']) != signature:
+                    return None
+                columns = {}
+                for name in data.files:
+                    if name.endswith('_keys'):
+                        col = int(name[:-5])
+                        columns[col] = (data[f'{col}_keys'], data[f'{col}_offsets'],
+                                        data[f'{col}_rows'], data[f'{col}_long'])
+                return cls(int(data['row_count']), columns)
+        except Exception:
+            return None
+
+class FilterSyntaxError(ValueError):
+    pass
+
+# Operadores da linguagem de filtro; "~" é contém e "!~" não contém
+FILTER_OPERATORS = ("==", "!=", ">=", "<=", ">", "<", "~", "!~")
+
+def tokenize_filter(text):
+    # Divide a expressão em (tipo, valor): nomes, números, textos entre aspas,
+    # operadores e parênteses. Colunas com espaços vão entre crases: `Preço Total`
+    import re
+    pattern = re.compile(r"""\s*(?:(?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+                             |(?P<column>`[^`]+`)
+                             |(?P<op>==|!=|>=|<=|!~|=|>|<|~|\(|\))
+                             |(?P<number>-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?(?![^\s()=!<>~]))
+                             |(?P<word>[^\s()=!<>~"'`]+))""", re.VERBOSE)
+    text = text.rstrip()
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        match = pattern.match(text, pos)
+        if match is None:
+            raise FilterSyntaxError(f"caractere inesperado na posição {pos + 1}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'string':
+            value = re.sub(r'\\(.)', r'\1', value[1:-1])
+        elif kind == 'column':
+            value = value[1:-1]
+        elif kind == 'number':
+            value = float(value) if any(char in value for char in '.eE') else int(value)
+        elif kind == 'op' and value == '=':
+            value = '=='
+        elif kind == 'word' and value.lower() in ('and', 'or', 'not'):
+            kind, value = 'keyword', value.lower()
+        tokens.append((kind, value))
+        pos = match.end()
+    return tokens
+
+def parse_filter(text):
+    # Descida recursiva (or < and < not < comparação ou parênteses) gerando uma árvore
+    # de tuplas: ('or', a, b), ('and', a, b), ('not', a), ('cmp', coluna, op, valor) e
+    # ('text', texto) para um texto entre aspas sozinho (busca em todas as colunas)
+    tokens = tokenize_filter(text)
+    pos = 0
+    
+    def peek():
+        return tokens[pos] if pos < len(tokens) else (None, None)
+        
+    def take():
+        nonlocal pos
+        token = peek()
+        pos += 1
+        return token
+        
+    def expression():
+        node = conjunction()
+        while peek() == ('keyword', 'or'):
+            take()
+            node = ('or', node, conjunction())
+        return node
+        
+    def conjunction():
+        node = negation()
+        while peek() == ('keyword', 'and'):
+            take()
+            node = ('and', node, negation())
+        return node
+        
+    def negation():
+        if peek() == ('keyword', 'not'):
+            take()
+            return ('not', negation())
+        return term()
+        
+    def term():
+        kind, name = take()
+        if (kind, name) == ('op', '('):
+            node = expression()
+            if take() != ('op', ')'):
+                raise FilterSyntaxError("parêntese não fechado")
+            return node
+        if kind not in ('word', 'column', 'string'):
+            raise FilterSyntaxError(f"esperado nome de coluna em vez de {name!r}" if kind
+                                    else "expressão incompleta")
+        op_kind, op = peek()
+        if op_kind != 'op' or op not in FILTER_OPERATORS:
+            if kind == 'string':
+                return ('text', name)
+            raise FilterSyntaxError(f"esperado operador depois de {name!r}")
+        take()
+        kind, value = take()
+        if kind == 'word':
+            value = {'true': True, 'false': False, 'null': None}.get(value.lower(), value)
+        elif kind not in ('string', 'number'):
+            raise FilterSyntaxError(f"esperado valor depois de {op!r}")
+        return ('cmp', name, op, value)
+        
+    if not tokens:
+        raise FilterSyntaxError("expressão vazia")
+    node = expression()
+    if pos < len(tokens):
+        raise FilterSyntaxError(f"{tokens[pos][1]!r} inesperado")
+    return node
+
+def resolve_filter(node, columns):
+    # Troca os nomes de coluna pela posição; maiúsculas e minúsculas só diferenciam
+    # colunas quando há duas com o mesmo nome
+    kind = node[0]
+    if kind in ('and', 'or'):
+        return (kind, resolve_filter(node[1], columns), resolve_filter(node[2], columns))
+    if kind == 'not':
+        return (kind, resolve_filter(node[1], columns))
+    if kind != 'cmp':
+        return node
+    _, name, op, value = node
+    names = [str(column) for column in columns]
+    if name in names:
+        position = names.index(name)
+    else:
+        matches = [i for i, column in enumerate(names) if column.lower() == name.lower()]
+        if len(matches) != 1:
+            raise FilterSyntaxError(f"coluna desconhecida: {name}")
+        position = matches[0]
+    if value is None and op not in ('==', '!='):
+        raise FilterSyntaxError("null só pode ser comparado com == ou !=")
+    return ('cmp', position, op, value)
+
+def filter_query(text, columns):
+    # Expressão da linguagem de filtro ou, quando o texto não é uma expressão válida
+    # para estas colunas, busca livre pelo texto inteiro. Devolve (árvore, erro)
+    try:
+        return resolve_filter(parse_filter(text), columns), None
+    except FilterSyntaxError as error:
+        return ('text', text), str(error)
+
+def filter_needles(node):
+    # Textos de busca livre (em minúsculas) dentro da árvore
+    if node[0] == 'text':
+        return [node[1].lower()]
+    if node[0] in ('and', 'or', 'not'):
+        return [needle for child in node[1:] for needle in filter_needles(child)]
+    return []
+
+def quote_filter_string(text):
+    return '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def filter_columns(node):
+    # Nomes de coluna citados na árvore (None para a busca livre, que vale para todas)
+    if node[0] == 'cmp':
+        return {node[1]}
+    if node[0] == 'text':
+        return {None}
+    return set().union(*(filter_columns(child) for child in node[1:]))
+
+def column_condition(name, condition):
+    # Caixa de filtro de uma coluna como termo da expressão: "> 40" vira (`Idade` > 40),
+    # entre parênteses para um "or" da caixa não se misturar com as outras. Texto sem
+    # operador, condição inválida ou que cita outra coluna vira `Email` ~ "texto"
+    column = "`" + str(name).replace("`", "") + "`"
+    if condition.startswith(FILTER_OPERATORS + ("=",)):
+        term = f"{column} {condition}"
+        try:
+            names = filter_columns(parse_filter(term))
+            if all(other is not None and other.lower() == column[1:-1].lower() for other in names):
+                return f"({term})"
+        except FilterSyntaxError:
+            pass
+    return f"{column} ~ {quote_filter_string(condition)}"
+
+def compare_column(column, op, value, text):
+    # Máscara vetorizada de uma comparação. Números comparam como números (o texto
+    # do filtro é convertido); textos comparam sem diferenciar maiúsculas, sobre a
+    # coluna em texto minúsculo que text() devolve (a mesma da busca livre, em cache)
+    import operator
+    if op in ('~', '!~'):
+        found = text().str.contains(str(value).lower(), regex=False).to_numpy(dtype=bool, na_value=False)
+        return ~found if op == '!~' else found
+    if value is None:
+        missing = column.isna().to_numpy()
+        return missing if op == '==' else ~missing
+    compare = {'==': operator.eq, '!=': operator.ne, '>': operator.gt, '>=': operator.ge,
+               '<': operator.lt, '<=': operator.le}[op]
+    numeric = column.dtype.kind in 'iufb'
+    if isinstance(value, str) and numeric:
+        try:
+            value = float(value)
+        except ValueError:
+            numeric = False
+    try:
+        if isinstance(value, (int, float)):
+            if not numeric:
+                column = pd.to_numeric(column, errors='coerce')
+            return compare(column, value).to_numpy(dtype=bool, na_value=False)
+        if column.dtype.kind == 'M':
+            return compare(column, pd.Timestamp(value)).to_numpy(dtype=bool, na_value=False)
+    except (TypeError, ValueError):
+        pass
+    return compare(text(), str(value).lower()).to_numpy(dtype=bool, na_value=False)
+
+def filter_mask(node, df, text, search):
+    # Máscara da árvore do filtro sobre df; text(col) devolve a coluna em texto
+    # minúsculo e search(texto) resolve a busca livre em todas as colunas
+    kind = node[0]
+    if kind == 'text':
+        return search(node[1].lower())
+    if kind == 'not':
+        return ~filter_mask(node[1], df, text, search)
+    if kind in ('and', 'or'):
+        left = filter_mask(node[1], df, text, search)
+        right = filter_mask(node[2], df, text, search)
+        return left & right if kind == 'and' else left | right
+    _, col, op, value = node
+    return compare_column(df.iloc[:, col], op, value, lambda: text(col))
+
+class FilterEngine(QObject):
+    # Filtro fora da thread da interface: busca livre em todas as colunas ou expressão
+    # da linguagem de filtro (Idade > 40 and Email ~ "gmail"). As colunas convertidas
+    # para texto ficam guardadas, e cada busca é só um str.contains por coluna.
+    # Resultados recentes ficam em cache, e uma busca livre que contém outra já
+    # resolvida só testa as linhas que casaram com ela
+    filtered = Signal(object, str)  # máscara de linhas (None = sem filtro), texto
+    index_ready = Signal(int)  # colunas indexadas
+    scanned = Signal(object, object)  # linhas lidas, total (tabela em janela)
+    
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self._model = model
+        # Tabela em janela (CSV/Parquet grande): cada busca percorre o arquivo em blocos
+        self._windowed = isinstance(model, WindowedTableModel)
+        self._text_columns = {}
+        # consulta -> (máscara, linhas encontradas, texto da busca livre ou None), em ordem LRU
+        self._results = OrderedDict()
+        # Índice de trigramas opcional; linhas editadas depois dele são sempre conferidas
+        self._index = None
+        self._index_task = None
+        self._dirty = {}
+        self._generation = 0
+        self._running = None  # (texto, geração) da busca em andamento
+        self._pending = None
+        self._latest = ""
+        self._closed = False
+        # Só edições invalidam o texto e os resultados guardados; blocos que chegam
+        # do disco durante a rolagem não mudam os dados
+        model.edited.connect(self._on_data_changed)
+        model.rowsInserted.connect(self._on_rows_inserted)
+        
+    def _on_data_changed(self, top_left, bottom_right, roles=()):
+        first, last = top_left.row(), bottom_right.row()
+        for column in range(top_left.column(), bottom_right.column() + 1):
+            self._dirty.setdefault(column, set()).update(range(first, last + 1))
+            text = self._text_columns.get(column)
+            if text is not None and last - first < INDEX_VERIFY_ROWS:
+                # Edição pontual: atualiza só as células, numa cópia do texto guardado
+                # (uma busca em andamento na thread de trabalho pode estar lendo o original)
+                text = text.copy()
+                text.iloc[first:last + 1] = [str(self._model.data(self._model.index(row, column))).lower()
+                                             for row in range(first, last + 1)]
+                self._text_columns[column] = text
+            else:
+                self._text_columns.pop(column, None)
+        self._results.clear()
+        self._generation += 1
+        
+    def _on_rows_inserted(self, parent, first, last):
+        self._text_columns.clear()
+        self._results.clear()
+        self._generation += 1
+        if self._latest:
+            self.request(self._latest)
             
-        if role == Qt.BackgroundRole:
-            return QColor(45, 45, 45)
+    def request(self, text):
+        self._latest = text
+        if not text:
+            self._pending = None
+            self.filtered.emit(None, text)
+            return
+        cached = self._results.get(text)
+        if cached is not None:
+            # Consulta repetida (ex.: apagar e redigitar): resposta imediata do cache
+            self._results.move_to_end(text)
+            self._pending = None
+            self.filtered.emit(cached[0], text)
+            return
+        if self._running is not None:
+            self._pending = text
+            if self._windowed:
+                self._task.cancel()  # a leitura do arquivo inteiro não vale mais
+            return
+        self._start(text)
+        
+    def warm_up(self):
+        # Converte as colunas para texto logo após a exibição, antes da primeira busca
+        if self._running is None and not self._windowed:
+            self._start(None)
+        
+    def _start(self, text):
+        self._running = (text, self._generation)
+        if text is None:
+            query = None
+            task = BackgroundTask(lambda progress: (text, query, self._mask(None, None, progress)))
+        elif self._windowed:
+            query, _ = filter_query(text, self._model.columns)
+            frames, total = self._model.iter_frames(), self._model.rowCount()
+            task = BackgroundTask(lambda progress: (text, query, self._scan(query, frames, total, progress)))
+            task.progress.connect(self.scanned)
+        else:
+            query, _ = filter_query(text, self._model.get_dataframe().columns)
+            candidates = {needle: self._candidates(needle) for needle in filter_needles(query)}
+            task = BackgroundTask(lambda progress: (text, query, self._evaluate(query, candidates, progress)))
+        task.finished.connect(self._on_finished)
+        task.failed.connect(self._on_failed)
+        task.cancelled.connect(self._on_cancelled)
+        self._task = task
+        task.start()
+        
+    def _candidates(self, needle):
+        # Linhas que casaram com a menor consulta em cache contida na nova: só elas
+        # podem conter a nova consulta ("bra" -> "bras" -> "brasil")
+        rows = self._model.rowCount()
+        best = None
+        for mask, count, query in self._results.values():
+            if query is None or query not in needle or len(mask) != rows:
+                continue
+            if best is None or count < best[1]:
+                best = (mask, count)
+        return None if best is None else np.flatnonzero(best[0])
+        
+    def _indexed_rows(self, index, col, needle, row_count):
+        # Candidatas do índice mais as linhas que ele não cobre (editadas ou acrescentadas)
+        rows = index.lookup(col, needle)
+        if rows is None:
+            return None
+        extra = [np.fromiter(self._dirty.get(col, ()), dtype=np.int64)]
+        if row_count > index.row_count:
+            extra.append(np.arange(index.row_count, row_count))
+        return np.union1d(rows, np.concatenate(extra)) if any(len(e) for e in extra) else rows
+        
+    def _text(self, df, col):
+        column = self._text_columns.get(col)
+        if column is None or len(column) != len(df):
+            column = self._text_columns[col] = text_column(df.iloc[:, col])
+        return column
+        
+    def _evaluate(self, query, candidates, progress):
+        # Comparações viram operações vetorizadas só nas colunas citadas; a busca
+        # livre passa pelo caminho de sempre (cache, índice)
+        df = self._model.get_dataframe()
+        return filter_mask(query, df, lambda col: self._text(df, col),
+                           lambda needle: self._mask(needle, candidates.get(needle), progress))
+        
+    def _scan(self, query, frames, total, progress):
+        # Tabela em janela: a consulta roda bloco a bloco sobre o arquivo, sem guardar
+        # texto nem blocos; só a máscara final fica em memória
+        masks = []
+        done = 0
+        for df in frames:
+            texts = {}
             
-        if role == Qt.ForegroundRole:
-            return QColor(200, 200, 200)
+            def text(col):
+                if col not in texts:
+                    texts[col] = text_column(df.iloc[:, col])
+                return texts[col]
+                
+            def search(needle):
+                mask = np.zeros(len(df), dtype=bool)
+                for col in range(df.shape[1]):
+                    mask |= text(col).str.contains(needle, regex=False).to_numpy(dtype=bool, na_value=False)
+                return mask
+                
+            masks.append(filter_mask(query, df, text, search))
+            done += len(df)
+            progress(done, total)
+        mask = np.concatenate(masks) if masks else np.zeros(0, dtype=bool)
+        if len(mask) < total:
+            mask = np.concatenate([mask, np.zeros(total - len(mask), dtype=bool)])
+        return mask[:total]
+        
+    def _mask(self, needle, candidates, progress):
+        df = self._model.get_dataframe()
+        index = self._index
+        mask = np.zeros(len(df), dtype=bool)
+        for col in range(df.shape[1]):
+            column = self._text(df, col)
+            if needle is not None:
+                rows = candidates
+                indexed = self._indexed_rows(index, col, needle, len(df)) if index else None
+                if indexed is not None:
+                    rows = indexed if rows is None else np.intersect1d(rows, indexed, assume_unique=True)
+                if rows is None:
+                    mask |= column.str.contains(needle, regex=False).to_numpy(dtype=bool, na_value=False)
+                elif len(rows):
+                    found = column.iloc[rows].str.contains(needle, regex=False).to_numpy(
+                        dtype=bool, na_value=False)
+                    mask[rows[found]] = True
+            progress(col + 1, df.shape[1])
+        return mask
+        
+    def enable_index(self, path=None, signature=None):
+        # Carrega o índice salvo ao lado do arquivo, ou monta em segundo plano (e salva)
+        if self._index is not None or self._index_task is not None:
+            return
+        clean = not self._dirty
+        
+        def build(progress):
+            if path and clean:
+                index = TrigramIndex.load(path, signature)
+                if index is not None:
+                    return index
+            df = self._model.get_dataframe()
+            for col in range(df.shape[1]):
+                self._text(df, col)
+            index = TrigramIndex.build(dict(self._text_columns), len(df), progress)
+            if path and clean:
+                # Só salva um índice que corresponde ao arquivo em disco (sem edições)
+                try:
+                    index.save(path, signature)
+                except OSError:
+                    pass
+            return index
             
-        return None
+        task = BackgroundTask(build)
+        task.finished.connect(self._on_index_ready)
+        task.failed.connect(self._on_index_failed)
+        self._index_task = task
+        task.start()
         
-    def headerData(self, section, orientation, role=Qt.DisplayRole):
-        if role == Qt.DisplayRole:
-            if orientation == Qt.Horizontal:
-                return str(self._data.columns[section])
-            else:
-                return str(self._data.index[section])
-        return None
+    def disable_index(self):
+        self._index = None
         
-    def setData(self, index, value, role=Qt.EditRole):
-        if not index.isValid() or role != Qt.EditRole:
-            return False
+    def _on_index_ready(self, index):
+        self._index_task = None
+        if self._closed:
+            self._release_if_idle()
+            return
+        self._index = index
+        self.index_ready.emit(len(index.columns))
             
-        row = index.row()
-        col = index.column()
-        column_name = self._data.columns[col]
+    def _on_index_failed(self, message):
+        self._index_task = None
+        if self._closed:
+            self._release_if_idle()
         
-        try:
-            # Try to convert to original dtype if possible
-            orig_dtype = self._data[column_name].dtype
-            converted_value = pd.Series([value], dtype=orig_dtype)[0]
-            self._data.iloc[row, col] = converted_value
-        except:
-            # If conversion fails, use string value
-            self._data.iloc[row, col] = value
+    def _on_finished(self, result):
+        text, query, mask = result
+        generation = self._running[1]
+        self._running = None
+        if self._closed:
+            self._release_if_idle()
+            return
+        if text is not None and generation == self._generation:
+            needle = query[1].lower() if query[0] == 'text' else None
+            self._results[text] = (mask, int(mask.sum()), needle)
+            self._results.move_to_end(text)
+            while len(self._results) > FILTER_CACHE_QUERIES:
+                self._results.popitem(last=False)
+        if generation != self._generation and self._pending is None and text is not None:
+            # Dados editados durante a busca: refaz com as colunas atualizadas
+            self._pending = self._latest
+        if self._pending:
+            pending, self._pending = self._pending, None
+            self._start(pending)
+        elif text is not None and text == self._latest:
+            self.filtered.emit(mask, text)
             
-        self.dataChanged.emit(index, index)
-        return True
+    def _on_cancelled(self):
+        self._running = None
+        if self._closed:
+            self._release_if_idle()
+        elif self._pending:
+            pending, self._pending = self._pending, None
+            self._start(pending)
         
-    def flags(self, index):
-        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
+    def _on_failed(self, message):
+        self._running = None
+        self._pending = None
+        if self._closed:
+            self._release_if_idle()
+            
+    def _release_if_idle(self):
+        # Só apaga o objeto quando nenhuma das suas threads está rodando
+        if self._running is None and self._index_task is None:
+            self.deleteLater()
+            
+    def close(self):
+        # Modelo substituído: libera as colunas em texto; a busca em andamento é descartada
+        self._closed = True
+        self._pending = None
+        self._text_columns.clear()
+        self._results.clear()
+        self._index = None
+        self.filtered.disconnect()
+        self._release_if_idle()
+
+class ColumnFilterBar(QWidget):
+    # Uma caixa de filtro por coluna, alinhada às seções do cabeçalho da tabela.
+    # Cada caixa aceita uma condição ("> 40", "== Brasil", "!= null") ou um texto
+    # simples, que vira "contém"; as condições são unidas com "and"
+    changed = Signal()
+    
+    def __init__(self, table_view, parent=None):
+        super().__init__(parent)
+        self.table_view = table_view
+        self.header = table_view.horizontalHeader()
+        self.names = []
+        self.edits = []
+        self.setFixedHeight(QLineEdit().sizeHint().height())
+        self.header.sectionResized.connect(self.relayout)
+        self.header.sectionMoved.connect(self.relayout)
+        self.header.geometriesChanged.connect(self.relayout)
+        table_view.horizontalScrollBar().valueChanged.connect(self.relayout)
         
-    def get_dataframe(self):
-        return self._data
+    def set_columns(self, names):
+        # Mantém as condições das colunas que continuam na tabela
+        previous = dict(self.conditions())
+        for edit in self.edits:
+            edit.deleteLater()
+        self.names = [str(name) for name in names]
+        self.edits = []
+        for name in self.names:
+            edit = QLineEdit(self)
+            edit.setPlaceholderText("filtro")
+            edit.setToolTip(f"Condição para {name}: > 40, == Brasil, ~ gmail, != null "
+                            "(texto simples = contém)")
+            edit.setText(previous.get(name, ""))
+            edit.textChanged.connect(lambda text: self.changed.emit())
+            edit.show()
+            self.edits.append(edit)
+        self.relayout()
+        
+    def relayout(self, *args):
+        # Mesma posição das seções do cabeçalho, já descontada a rolagem horizontal.
+        # No encerramento do programa a tabela ainda emite sinais (rolagem) depois
+        # de o cabeçalho já ter sido destruído
+        if not isValid(self.header):
+            return
+        offset = self.table_view.x() + self.table_view.viewport().x() - self.x()
+        for column, edit in enumerate(self.edits):
+            edit.setVisible(not self.header.isSectionHidden(column))
+            edit.setGeometry(offset + self.header.sectionViewportPosition(column), 0,
+                             self.header.sectionSize(column), self.height())
+            
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.relayout()
+        
+    def conditions(self):
+        return [(name, edit.text().strip()) for name, edit in zip(self.names, self.edits)
+                if edit.text().strip()]
 
 class EditorUniversal(QMainWindow):
     def __init__(self):
@@ -118,6 +3455,12 @@ class EditorUniversal(QMainWindow):
         self.current_file = None
         self.current_file_type = None
         self.df = None
+        self.model = None
+        self._task = None
+        self._loading = False
+        self.filter_engine = None
+        self._filter_is_expression = False
+        self._load_options = {}
         self.init_ui()
         
     def init_ui(self):
@@ -195,6 +3538,7 @@ class EditorUniversal(QMainWindow):
         self.limit_label = QLabel("Limite de dados:")
         self.limit_input = QLineEdit("100")
         self.limit_input.setValidator(QIntValidator(1, 100000))
+        self.limit_input.setToolTip("Usado só em tabelas sem chave primária; as demais são paginadas sob demanda")
         self.connect_btn = QPushButton("Conectar")
         self.connect_btn.clicked.connect(self.connect_to_database)
         self.limit_layout.addWidget(self.limit_label)
@@ -225,7 +3569,8 @@ class EditorUniversal(QMainWindow):
         self.file_type_label = QLabel("Perfil de Saída:")
         self.file_type_combo = QComboBox()
         # Substituir a linha existente (aproximadamente linha 238)
-        self.file_type_combo.addItems(["CSV", "Excel", "SQLite", "JSON", "XML", "YAML", "SQL"])
+        self.file_type_combo.addItems([name for name, file_format in FILE_FORMATS.items()
+                                       if file_format.writer and (file_format.available() or file_format.install_hint)])
         
         self.btn_save = QPushButton(QIcon.fromTheme("document-save", QIcon(":/icons/save.png")), "Salvar")
         self.btn_save.clicked.connect(self.save_file)
@@ -233,7 +3578,7 @@ class EditorUniversal(QMainWindow):
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)  # Inicialmente invisível
         self.progress_bar.setTextVisible(True)
-        self.progress_bar.setFormat("%v/%m linhas carregadas (%p%)")
+        self.progress_bar.setFormat("%p%")
         self.progress_bar.setStyleSheet("""
             QProgressBar {
                 border: 1px solid #5c5c5c;
@@ -247,6 +3592,9 @@ class EditorUniversal(QMainWindow):
             }
         """)
         
+        self.cancel_btn = QPushButton("Cancelar")
+        self.cancel_btn.setVisible(False)
+        self.cancel_btn.clicked.connect(self.cancel_task)
         
         # Filter layout
         self.filter_layout = QHBoxLayout()
@@ -254,6 +3602,16 @@ class EditorUniversal(QMainWindow):
         self.filter_input = QLineEdit()
         self.filter_input.textChanged.connect(self.filter_table)
         self.filter_input.setClearButtonEnabled(True)
+        self.filter_input.setPlaceholderText('Texto ou expressão: Idade > 40 and Email ~ "gmail"')
+        # O filtro só roda quando a digitação para por FILTER_DEBOUNCE_MS
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_DEBOUNCE_MS)
+        self.filter_timer.timeout.connect(self.apply_filter)
+        self.index_check = QCheckBox("Indexar busca")
+        self.index_check.setToolTip("Índice de trigramas para buscas repetidas em tabelas grandes; "
+                                    f"salvo ao lado do arquivo ({INDEX_SUFFIX})")
+        self.index_check.toggled.connect(self.toggle_search_index)
         
         # Add widgets to layouts
         self.toolbar_layout.addWidget(self.btn_open)
@@ -264,12 +3622,17 @@ class EditorUniversal(QMainWindow):
         
         self.filter_layout.addWidget(self.filter_label)
         self.filter_layout.addWidget(self.filter_input)
+        self.filter_layout.addWidget(self.index_check)
         
         # Create table view
         self.table_view = QTableView()
         self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
         self.table_view.horizontalHeader().setStretchLastSection(True)
         self.table_view.setAlternatingRowColors(True)
+        # Filtros por coluna logo acima do cabeçalho
+        self.column_filters = ColumnFilterBar(self.table_view)
+        self.column_filters.changed.connect(self.filter_timer.start)
+        self.column_filters.hide()
         
         # Create status bar
         self.status_bar = QStatusBar()
@@ -278,11 +3641,15 @@ class EditorUniversal(QMainWindow):
         # Add layouts to main layout
         self.main_layout.addLayout(self.toolbar_layout)
         # Adicionar a barra de progresso ao layout principal
-        self.main_layout.addWidget(self.progress_bar)
+        self.progress_layout = QHBoxLayout()
+        self.progress_layout.addWidget(self.progress_bar)
+        self.progress_layout.addWidget(self.cancel_btn)
+        self.main_layout.addLayout(self.progress_layout)
 
         # Adicionar o layout de filtro depois da barra de progresso
         self.main_layout.addLayout(self.filter_layout)
         
+        self.main_layout.addWidget(self.column_filters)
         self.main_layout.addWidget(self.table_view)
         
         # Setup menu
@@ -309,91 +3676,83 @@ class EditorUniversal(QMainWindow):
     # Adicionar depois do método toggle_sql_fields na classe EditorUniversal
 
     def connect_to_database(self):
-        # Validar limite
+        # Tabelas com chave primária são paginadas sem limite; nas demais as linhas
+        # chegam em lotes e aparecem na tabela conforme chegam
         limit = int(self.limit_input.text())
-        if limit > 1000:
-            reply = QMessageBox.warning(
-                self, 
-                "Aviso de desempenho",
-                f"O limite de {limit} linhas pode afetar o desempenho e consumir muita memória.\nDeseja continuar mesmo assim?",
-                QMessageBox.Yes | QMessageBox.No,
-                QMessageBox.No
-            )
-            if reply == QMessageBox.No:
-                return
 
+        # Obter parâmetros de conexão
+        target = {
+            'db_type': self.db_type_combo.currentText(),
+            'host': self.host_input.text() or "localhost",
+            'user': self.user_input.text(),
+            'password': self.pass_input.text(),
+            'database': self.db_input.text(),
+            'table': self.table_input.text(),
+            'limit': limit,
+        }
+        
+        # Verificar se todos os campos necessários estão preenchidos
+        if not target['database'] or not target['table']:
+            QMessageBox.critical(self, "Erro de Conexão", "Erro: Base de dados e tabela são obrigatórios")
+            return
+        
         # Mostrar barra de progresso
+        sql_format = FILE_FORMATS["SQL"]
         self.progress_bar.setVisible(True)
-        self.progress_bar.setValue(10)
-        QApplication.processEvents()
+        self.progress_bar.setMaximum(1000 if sql_format.progress else 0)
+        self.progress_bar.setValue(0)
+        self.status_bar.showMessage(f"Conectando a {target['db_type']}...")
         
-        # Obter parâmetros de conexão
-        db_type = self.db_type_combo.currentText()
-        host = self.host_input.text() or "localhost"
-        user = self.user_input.text()
-        password = self.pass_input.text()
-        database = self.db_input.text()
-        table = self.table_input.text()
+        self._streamed_rows = 0
+        self.run_task(sql_format.read, target,
+                      on_batch=(lambda df: self.on_database_batch(target, df))
+                      if sql_format.streaming_read else None,
+                      on_finished=lambda rows: self.on_database_loaded(target, rows),
+                      error_title="Erro de Conexão")
         
-        try:
-            # Verificar se todos os campos necessários estão preenchidos
-            if not database or not table:
-                raise ValueError("Base de dados e tabela são obrigatórios")
-            
-            self.progress_bar.setValue(20)
-            QApplication.processEvents()
-            
-            # Conectar ao banco de dados conforme o tipo
-            if db_type == "PostgreSQL":
-                if not POSTGRES_AVAILABLE:
-                    raise ImportError("Biblioteca 'psycopg2' não instalada. Use: pip install psycopg2-binary")
-                
-                conn = psycopg2.connect(
-                    host=host,
-                    user=user,
-                    password=password,
-                    database=database
-                )
-                
-            elif db_type == "MySQL/MariaDB":
-                if not MYSQL_AVAILABLE:
-                    raise ImportError("Biblioteca 'mysql-connector-python' não instalada. Use: pip install mysql-connector-python")
-                
-                conn = mysql.connector.connect(
-                    host=host,
-                    user=user,
-                    password=password,
-                    database=database
-                )
-                
-            
-            
-            self.progress_bar.setValue(40)
-            QApplication.processEvents()
-            
-            # Executar consulta
-            query = f"SELECT * FROM {table} LIMIT {limit}"
-            self.df = pd.read_sql(query, conn)
-            conn.close()
-            
-            self.progress_bar.setValue(80)
-            QApplication.processEvents()
-            
-            # Exibir dados
+    def on_database_batch(self, target, df):
+        db_type, database, table = target['db_type'], target['database'], target['table']
+        if self._streamed_rows == 0:
+            # Primeiro lote: a tabela já fica utilizável enquanto o resto chega
+            self.df = df
             self.current_file = f"SQL:{db_type}-{database}.{table}"
             self.current_file_type = "SQL"
             self.display_data()
-            
-            # Atualizar status
-            self.status_bar.showMessage(f"Conectado a {db_type}: {database}.{table} ({len(self.df)} linhas)")
-            self.setWindowTitle(f"Bananapp - Versão 1.5 - SQL:{database}.{table}")
-            
-            self.progress_bar.setValue(100)
-            QTimer.singleShot(1000, lambda: self.progress_bar.setVisible(False))
-            
-        except Exception as e:
-            self.progress_bar.setVisible(False)
-            QMessageBox.critical(self, "Erro de Conexão", f"Erro: {str(e)}")
+        else:
+            self.model.append_rows(df)
+        self._streamed_rows += len(df)
+        self.status_bar.showMessage(f"Carregando {database}.{table}... {self._streamed_rows} linhas")
+        
+    def on_database_loaded(self, target, result):
+        db_type, database, table = target['db_type'], target['database'], target['table']
+        if isinstance(result, int):
+            # Tabela sem chave primária, já lida em fluxo
+            self.df = self.model.get_dataframe()
+            rows = result
+        elif isinstance(result, pd.DataFrame):
+            # Tabela sem chave primária lida de uma vez (leitor sem fluxo)
+            self.df = result
+            self.current_file = f"SQL:{db_type}-{database}.{table}"
+            self.current_file_type = "SQL"
+            self.display_data()
+            rows = len(result)
+        else:
+            # Tabela paginada pela chave primária: as páginas chegam conforme a rolagem
+            self.df = None
+            self.current_file = f"SQL:{db_type}-{database}.{table}"
+            self.current_file_type = "SQL"
+            model = WindowedTableModel(result)
+            model.fetch_failed.connect(
+                lambda message: self.status_bar.showMessage(f"Erro ao ler do banco de dados: {message}"))
+            self.display_data(model)
+            rows = f"~{result.row_count}"
+        
+        # Atualizar status
+        self.status_bar.showMessage(f"Conectado a {db_type}: {database}.{table} ({rows} linhas)")
+        self.setWindowTitle(f"Bananapp - Versão 1.5 - SQL:{database}.{table}")
+        
+        self.progress_bar.setValue(self.progress_bar.maximum())
+        QTimer.singleShot(1000, lambda: self.progress_bar.setVisible(False))
 
     def setup_dark_theme(self):
         app = QApplication.instance()
@@ -512,479 +3871,481 @@ class EditorUniversal(QMainWindow):
         
     def open_file(self):
         options = QFileDialog.Options()
-        file_types = "Todos os arquivos (*);;CSV (*.csv);;Excel (*.xls *.xlsx);;SQLite (*.db *.sqlite);;JSON (*.json);;XML (*.xml);;YAML (*.yml *.yaml)"
-        if BSON_AVAILABLE:
-            file_types += ";;BSON (*.bson)"
+        file_types = ";;".join(["Todos os arquivos (*)"] + [
+            file_format.file_filter() for file_format in FILE_FORMATS.values()
+            if file_format.file_based and file_format.reader and file_format.available()])
             
         file_name, _ = QFileDialog.getOpenFileName(self, "Abrir Arquivo", "", file_types, options=options)
         
         if file_name:
+            self.load_file(file_name)
+            
+    def load_file(self, file_name):
+        # Opções de leitura do formato (planilha, colunas...) são pedidas antes
+        file_format = format_for_extension(os.path.splitext(file_name)[1].lower())
+        options = {}
+        if file_format is not None and file_format.options_dialog is not None:
             try:
-                # Exibir a barra de progresso
-                self.progress_bar.setVisible(True)
-                self.progress_bar.setValue(0)
-                self.progress_bar.setMaximum(100)  # Padrão para porcentagem
-                self.status_bar.showMessage("Carregando arquivo...")
-                
-                # Processar o arquivo e atualizar a barra de progresso
-                QApplication.processEvents()  # Importante para atualizar a interface
-                
-                # Determinar file type from extension
-                extension = os.path.splitext(file_name)[1].lower()
-                
-                # Para formatos em que podemos contar linhas facilmente
-                if extension in ['.csv']:
-                    try:
-                        # Contar linhas para arquivos CSV
-                        with open(file_name, 'r', encoding='utf-8') as f:
-                            total_lines = sum(1 for _ in f)
-                        self.progress_bar.setMaximum(total_lines)
-                        
-                        # Atualiza para 25% após contar as linhas
-                        self.progress_bar.setValue(total_lines // 4)
-                        QApplication.processEvents()
-                        
-                        # Abrir o arquivo novamente para processamento
-                        self.file_type_combo.setCurrentText("CSV")
-                        self.df = pd.read_csv(file_name)
-                        
-                        # Atualiza para 100% após carregar
-                        self.progress_bar.setValue(total_lines)
-                    except Exception:
-                        # Se falhar ao contar linhas, use abordagem padrão
-                        self.progress_bar.setValue(50)
-                        QApplication.processEvents()
-                        self.df = pd.read_csv(file_name)
-                        self.progress_bar.setValue(100)
-                
-                elif extension in ['.xls', '.xlsx']:
-                    self.file_type_combo.setCurrentText("Excel")
-                    # Para Excel, usamos uma abordagem de etapas
-                    self.progress_bar.setValue(30)  # Início do carregamento
-                    QApplication.processEvents()
-                    
-                    self.df = pd.read_excel(file_name)
-                    self.progress_bar.setValue(100)  # Carregamento completo
-                    QApplication.processEvents()
-                    
-                elif extension in ['.db', '.sqlite']:
-                    self.file_type_combo.setCurrentText("SQLite")
-                    
-                    # Etapa 1: Conectar ao banco
-                    self.progress_bar.setValue(20)
-                    QApplication.processEvents()
-                    
-                    conn = sqlite3.connect(file_name)
-                    cursor = conn.cursor()
-                    
-                    # Etapa 2: Buscar tabelas
-                    self.progress_bar.setValue(40)
-                    QApplication.processEvents()
-                    
-                    cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-                    tables = cursor.fetchall()
-                    
-                    if len(tables) == 0:
-                        conn.close()
-                        self.progress_bar.setVisible(False)
-                        QMessageBox.warning(self, "Erro", "O arquivo SQLite não contém tabelas.")
-                        return
-                    
-                    # Seleciona a primeira tabela
-                    table_name = tables[0][0]
-                    
-                    # Etapa 3: Carregar dados
-                    self.progress_bar.setValue(60)
-                    QApplication.processEvents()
-                    
-                    self.df = pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
-                    conn.close()
-                    
-                    # Etapa 4: Finaliza
-                    self.progress_bar.setValue(100)
-                    QApplication.processEvents()
-                    
-                elif extension in ['.json']:
-                    self.file_type_combo.setCurrentText("JSON")
-                    
-                    # Etapa 1: Início
-                    self.progress_bar.setValue(25)
-                    QApplication.processEvents()
-                    
-                    # Etapa 2: Leitura do arquivo
-                    with open(file_name, 'r', encoding='utf-8') as f:
-                        self.progress_bar.setValue(50)
-                        QApplication.processEvents()
-                        json_data = json.load(f)
-                    
-                    # Etapa 3: Conversão para DataFrame
-                    self.progress_bar.setValue(75)
-                    QApplication.processEvents()
-                    
-                    # Handle both list of objects and single object
-                    if isinstance(json_data, list):
-                        self.df = pd.json_normalize(json_data)
-                    else:
-                        self.df = pd.json_normalize([json_data])
-                    
-                    # Etapa 4: Finaliza
-                    self.progress_bar.setValue(100)
-                    QApplication.processEvents()
-                    
-                elif extension in ['.xml']:
-                    self.file_type_combo.setCurrentText("XML")
-                    
-                    # Etapa 1: Início
-                    self.progress_bar.setValue(25)
-                    QApplication.processEvents()
-                    
-                    # Etapa 2: Parse do XML
-                    tree = ET.parse(file_name)
-                    root = tree.getroot()
-                    
-                    self.progress_bar.setValue(50)
-                    QApplication.processEvents()
-                    
-                    # Etapa 3: Conversão para DataFrame
-                    data = []
-                    for child in root:
-                        row = {}
-                        for element in child:
-                            row[element.tag] = element.text
-                        data.append(row)
-                        
-                        # Atualiza periodicamente para arquivos grandes
-                        if len(data) % 100 == 0:
-                            self.progress_bar.setValue(50 + min(len(data) // 10, 40))
-                            QApplication.processEvents()
-                    
-                    self.df = pd.DataFrame(data)
-                    
-                    # Etapa 4: Finaliza
-                    self.progress_bar.setValue(100)
-                    QApplication.processEvents()
-                    
-                elif extension in ['.yml', '.yaml']:
-                    self.file_type_combo.setCurrentText("YAML")
-                    
-                    # Etapa 1: Início
-                    self.progress_bar.setValue(30)
-                    QApplication.processEvents()
-                    
-                    # Etapa 2: Leitura do arquivo
-                    with open(file_name, 'r', encoding='utf-8') as f:
-                        yaml_data = yaml.safe_load(f)
-                    
-                    self.progress_bar.setValue(70)
-                    QApplication.processEvents()
-                    
-                    # Etapa 3: Conversão para DataFrame
-                    if isinstance(yaml_data, list):
-                        self.df = pd.DataFrame(yaml_data)
-                    else:
-                        self.df = pd.DataFrame([yaml_data])
-                    
-                    # Etapa 4: Finaliza
-                    self.progress_bar.setValue(100)
-                    QApplication.processEvents()
-                    
-                elif extension in ['.bson'] and BSON_AVAILABLE:
-                    self.file_type_combo.setCurrentText("BSON")
-                    
-                    # Etapa 1: Início
-                    self.progress_bar.setValue(30)
-                    QApplication.processEvents()
-                    
-                    # Etapa 2: Leitura do arquivo
-                    with open(file_name, 'rb') as f:
-                        bson_data = bson.loads(f.read())
-                    
-                    self.progress_bar.setValue(70)
-                    QApplication.processEvents()
-                    
-                    # Etapa 3: Conversão para DataFrame
-                    self.df = pd.DataFrame([bson_data])
-                    
-                    # Etapa 4: Finaliza
-                    self.progress_bar.setValue(100)
-                    QApplication.processEvents()
-                    
-                else:
-                    # Tenta inferir o formato
-                    self.progress_bar.setValue(30)
-                    QApplication.processEvents()
-                    
-                    try:
-                        self.df = pd.read_csv(file_name)
-                        self.file_type_combo.setCurrentText("CSV")
-                    except:
-                        self.progress_bar.setVisible(False)
-                        QMessageBox.warning(self, "Erro", "Formato de arquivo não reconhecido ou não suportado.")
-                        return
-                    
-                    self.progress_bar.setValue(100)
-                    QApplication.processEvents()
-                
-                # Após o carregamento completo, exibir os dados
-                self.current_file = file_name
-                self.current_file_type = self.file_type_combo.currentText()
-                self.display_data()
-                
-                # Atualizar status e esconder a barra após um curto delay
-                self.status_bar.showMessage(f"Arquivo carregado: {os.path.basename(file_name)} ({len(self.df)} linhas)")
-                QTimer.singleShot(1000, lambda: self.progress_bar.setVisible(False))
-                
+                options = file_format.options_dialog(self, file_name)
             except Exception as e:
-                self.progress_bar.setVisible(False)
                 QMessageBox.critical(self, "Erro ao abrir arquivo", f"Erro: {str(e)}")
+                return
+            if options is None:
+                return
+        
+        # Exibir a barra de progresso (ocupada se o formato não informa o progresso)
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setMaximum(1000 if file_format is not None and file_format.progress else 0)
+        self.status_bar.showMessage("Carregando arquivo...")
+        
+        # A leitura roda em outra thread; a interface continua respondendo
+        self._load_options = options
+        self.run_task(read_data_file, file_name, **options,
+                      on_finished=self.on_file_loaded,
+                      error_title="Erro ao abrir arquivo")
+        
+    def on_file_loaded(self, result):
+        file_name, file_type, data = result
+        self.file_type_combo.setCurrentText(file_type)
         
-    def display_data(self):
-        if self.df is not None:
+        windowed_model = None
+        if isinstance(data, pd.DataFrame):
+            self.df = data
+        else:
+            self.df = None
+            windowed_model = WindowedTableModel(data)
+        
+        # Após o carregamento completo, exibir os dados
+        self.current_file = file_name
+        self.current_file_type = self.file_type_combo.currentText()
+        self.display_data(windowed_model)
+        
+        # Atualizar status e esconder a barra após um curto delay
+        self.status_bar.showMessage(f"Arquivo carregado: {os.path.basename(file_name)} ({self.model.rowCount()} linhas)")
+        QTimer.singleShot(1000, lambda: self.progress_bar.setVisible(False))
+        
+    def run_task(self, function, *args, on_finished, on_batch=None, error_title="Erro", rate_unit=None,
+                 **kwargs):
+        task = BackgroundTask(function, *args, streaming=on_batch is not None, **kwargs)
+        task.progress.connect(self.on_task_progress)
+        task.batch.connect(self.on_task_batch)
+        task.finished.connect(self.on_task_finished)
+        task.failed.connect(self.on_task_failed)
+        task.cancelled.connect(self.on_task_cancelled)
+        
+        self._task = task
+        self._task_on_finished = on_finished
+        self._task_on_batch = on_batch
+        # Vazão (unidades/s) mostrada na barra de status junto com a mensagem atual
+        self._task_rate_unit = rate_unit
+        self._task_message = self.status_bar.currentMessage()
+        self._task_started = time.perf_counter()
+        self._task_error_title = error_title
+        self.set_task_running(True)
+        task.start()
+        
+    def set_task_running(self, running):
+        self._loading = running
+        self.cancel_btn.setVisible(running)
+        self.cancel_btn.setEnabled(running)
+        self.btn_open.setEnabled(not running)
+        self.btn_save.setEnabled(not running)
+        self.connect_btn.setEnabled(not running)
+        
+    def cancel_task(self):
+        if self._task is not None:
+            self.cancel_btn.setEnabled(False)
+            self.status_bar.showMessage("Cancelando...")
+            self._task.cancel()
+            
+    def on_task_progress(self, done, total):
+        # Barra ocupada (formato sem progresso) só vira percentual com avanço real
+        if total and done:
+            self.progress_bar.setMaximum(1000)
+            self.progress_bar.setValue(int(done * 1000 / total))
+        if self._task_rate_unit and done:
+            unit = self._task_rate_unit
+            elapsed = time.perf_counter() - self._task_started
+            self.status_bar.showMessage(
+                f"{self._task_message} {done:,} de {total:,} {unit} ({done / max(elapsed, 1e-6):,.0f} {unit}/s)")
+        
+    def on_task_batch(self, result):
+        if self._task_on_batch is not None:
+            self._task_on_batch(result)
+            
+    def on_task_finished(self, result):
+        self.set_task_running(False)
+        self._task = None
+        try:
+            self._task_on_finished(result)
+        except Exception as e:
+            self.progress_bar.setVisible(False)
+            QMessageBox.critical(self, self._task_error_title, f"Erro: {str(e)}")
+            
+    def on_task_failed(self, message):
+        self.set_task_running(False)
+        self._task = None
+        self.progress_bar.setVisible(False)
+        QMessageBox.critical(self, self._task_error_title, f"Erro: {message}")
+        
+    def on_task_cancelled(self):
+        self.set_task_running(False)
+        self._task = None
+        self.progress_bar.setVisible(False)
+        self.status_bar.showMessage("Operação cancelada.")
+        
+    def display_data(self, model=None):
+        if model is not None or self.df is not None:
             # Create model and proxy model for filtering
-            self.model = PandasModel(self.df)
-            self.proxy_model = QSortFilterProxyModel()
-            self.proxy_model.setFilterCaseSensitivity(Qt.CaseInsensitive)
-            self.proxy_model.setSourceModel(self.model)
+            self.model = model if model is not None else PandasModel(self.df)
+            if self.filter_engine is not None:
+                self.filter_engine.close()
+                self.filter_engine = None
+            queryable = getattr(self.model, 'can_query', False)
+            in_memory = isinstance(self.model, PandasModel)
+            # CSV/Parquet em janela: o filtro percorre o arquivo em blocos numa thread
+            scanned = isinstance(self.model, WindowedTableModel) and not queryable
+            if in_memory or scanned:
+                # Filtro vetorizado em segundo plano entregando as linhas a um proxy leve
+                self.proxy_model = RowIndexProxyModel()
+                self.filter_engine = FilterEngine(self.model, self)
+                self.filter_engine.filtered.connect(self.on_filter_ready)
+                self.filter_engine.index_ready.connect(self.on_search_index_ready)
+                self.filter_engine.scanned.connect(self.on_filter_scanned)
+                QTimer.singleShot(0, self.filter_engine.warm_up)
+                self.proxy_model.setSourceModel(self.model)
+            else:
+                # SQLite e servidor SQL filtram e ordenam na própria consulta
+                self.proxy_model = None
+            # O índice de trigramas é montado sobre a tabela em memória
+            self.index_check.setEnabled(in_memory)
+            if in_memory:
+                # Índice já salvo para este arquivo é reaproveitado automaticamente
+                index_path, _ = self.search_index_location()
+                if self.index_check.isChecked() or (index_path and os.path.exists(index_path)):
+                    self.index_check.blockSignals(True)
+                    self.index_check.setChecked(True)
+                    self.index_check.blockSignals(False)
+                    QTimer.singleShot(0, lambda: self.toggle_search_index(True))
             
-            # Set the proxy model to the table view
-            self.table_view.setModel(self.proxy_model)
+            # Set the proxy model to the table view; modelos que filtram na consulta
+            # (SQLite e servidor SQL) vão direto para a tabela, sem proxy
+            self.table_view.setModel(self.model if self.proxy_model is None else self.proxy_model)
             
-            # Enable sorting
-            self.table_view.setSortingEnabled(True)
-
-            self.table_view.setModel(self.proxy_model)
-            self.table_view.setSortingEnabled(True)
+            # Enable sorting (ordenar um modelo em janela leria a tabela inteira);
+            # sem indicador inicial, para não disparar ordenação pela coluna 0
+            self.table_view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+            self.table_view.setSortingEnabled(in_memory or queryable)
+            
+            # Filtros por coluna só onde a expressão é avaliada (memória, blocos ou SQL)
+            self.column_filters.set_columns([self.model.headerData(column, Qt.Horizontal)
+                                             for column in range(self.model.columnCount())])
+            self.column_filters.setVisible(in_memory or scanned or queryable)
             
             # Ajuste automático das colunas baseado no conteúdo
             self.table_view.resizeColumnsToContents()
             
             # Ajuste adicional para garantir que os cabeçalhos também sejam considerados
             header = self.table_view.horizontalHeader()
-            for column in range(len(self.df.columns)):
+            for column in range(self.model.columnCount()):
                 width = header.sectionSize(column)
                 # Aumentamos um pouco a largura para melhor visualização
                 header.resizeSection(column, width + 20)
             
+            # Filtro digitado antes da troca de dados vale também para os novos
+            if self.filter_input.text() or self.column_filters.conditions():
+                self.filter_timer.start()
+            
             # Update window title
             if self.current_file:
                 self.setWindowTitle(f"Bananapp - Versão 1.5 - {os.path.basename(self.current_file)}")
             
             
+    def closeEvent(self, event):
+        # Cancela e espera todas as tarefas em segundo plano (leitura, gravação, blocos
+        # da tabela, filtro): uma thread ainda rodando derrubaria o processo na saída
+        for task in list(BackgroundTask.running):
+            task.wait()
+        super().closeEvent(event)
+        
     def filter_table(self, text):
-        self.proxy_model.setFilterFixedString(text)
-        self.proxy_model.setFilterKeyColumn(-1)  # -1 means search all columns
+        # Reinicia a espera a cada tecla; apply_filter roda quando a digitação para
+        self.filter_timer.start()
+        
+    def apply_filter(self):
+        if self.model is None:
+            return
+        text = self.filter_expression()
+        query, error = filter_query(text, self.column_filters.names)
+        self._filter_is_expression = error is None and query[0] != 'text'
+        if error and any(op in text for op in FILTER_OPERATORS + ("`",)):
+            # Parecia uma expressão mas não é válida: o texto vale como busca livre
+            self.status_bar.showMessage(f"Filtro buscado como texto ({error})")
+        elif text and self.filter_engine is not None:
+            self.status_bar.showMessage(f'Filtrando por "{text}"...')
+        if self.filter_engine is not None:
+            self.filter_engine.request(text)
+        else:
+            self.model.set_filter_text(text)
+        
+    def filter_expression(self):
+        # Filtro geral mais as condições das colunas, unidos com "and"; o filtro geral
+        # entra entre aspas quando não é uma expressão válida (busca livre)
+        text = self.filter_input.text()
+        terms = [column_condition(name, condition)
+                 for name, condition in self.column_filters.conditions()]
+        if not terms:
+            return text
+        if text.strip():
+            _, error = filter_query(text, self.column_filters.names)
+            terms.insert(0, quote_filter_string(text) if error else f"({text})")
+        return " and ".join(terms)
+        
+    def search_index_location(self):
+        # Arquivo do índice e assinatura do arquivo de dados (tamanho, data, opções de leitura)
+        if not self.current_file or not os.path.isfile(self.current_file) or self.df is None:
+            return None, None
+        stat = os.stat(self.current_file)
+        signature = json.dumps([stat.st_mtime_ns, stat.st_size, len(self.df),
+                                [str(column) for column in self.df.columns], self._load_options],
+                               default=str)
+        return self.current_file + INDEX_SUFFIX, signature
+        
+    def toggle_search_index(self, checked):
+        if self.filter_engine is None:
+            return
+        if checked:
+            self.status_bar.showMessage("Montando índice de busca...")
+            self.filter_engine.enable_index(*self.search_index_location())
+        else:
+            self.filter_engine.disable_index()
+            
+    def on_search_index_ready(self, columns):
+        self.status_bar.showMessage(f"Índice de busca pronto ({columns} colunas indexadas)")
+        
+    def on_filter_scanned(self, done, total):
+        self.status_bar.showMessage(f"Filtrando... {done:,} de {total:,} linhas lidas")
+        
+    def on_filter_ready(self, mask, text):
+        self.proxy_model.set_mask(mask)
+        if mask is not None:
+            found = f"{self.proxy_model.rowCount()} de {self.model.rowCount()} linhas"
+            self.status_bar.showMessage(f"{found} atendem a {text}" if self._filter_is_expression
+                                        else f'{found} contêm "{text}"')
         
     def save_file(self):
-        if self.df is None:
+        if self.model is None:
             QMessageBox.warning(self, "Aviso", "Nenhum dado para salvar.")
             return
             
-        # Update dataframe from model to ensure all edits are saved
-        self.df = self.model.get_dataframe()
-        
-        options = QFileDialog.Options()
         file_type = self.file_type_combo.currentText()
-        
-        if file_type == "CSV":
-            file_name, _ = QFileDialog.getSaveFileName(self, "Salvar Arquivo", "", "CSV (*.csv)", options=options)
-            if file_name:
-                if not file_name.endswith('.csv'):
-                    file_name += '.csv'
-                self.df.to_csv(file_name, index=False)
-                
-        elif file_type == "Excel":
-            if not EXCEL_AVAILABLE:
-                QMessageBox.warning(self, "Aviso", "Para salvar em formato Excel (.xlsx), você precisa instalar a biblioteca 'openpyxl'.\nUse o comando: pip install openpyxl")
+        file_format = FILE_FORMATS.get(file_type)
+        if file_format is None or file_format.writer is None:
+            QMessageBox.warning(self, "Aviso", f"Formato {file_type} não suportado para salvar.")
+            return
+        if not file_format.available():
+            QMessageBox.warning(self, "Aviso", file_format.install_hint or f"Formato {file_type} indisponível.")
+            return
+            
+        if file_format.file_based:
+            options = QFileDialog.Options()
+            file_name, _ = QFileDialog.getSaveFileName(self, "Salvar Arquivo", "", file_format.file_filter(), options=options)
+            if not file_name:
                 return
-                
-            file_name, _ = QFileDialog.getSaveFileName(self, "Salvar Arquivo", "", "Excel (*.xlsx)", options=options)
-            if file_name:
-                if not file_name.endswith('.xlsx'):
-                    file_name += '.xlsx'
-                self.df.to_excel(file_name, index=False)
-                
-        elif file_type == "SQLite":
-            file_name, _ = QFileDialog.getSaveFileName(self, "Salvar Arquivo", "", "SQLite (*.db)", options=options)
-            if file_name:
-                if not file_name.endswith('.db'):
-                    file_name += '.db'
-                conn = sqlite3.connect(file_name)
-                self.df.to_sql('data', conn, if_exists='replace', index=False)
-                conn.close()
-                
-        elif file_type == "JSON":
-            file_name, _ = QFileDialog.getSaveFileName(self, "Salvar Arquivo", "", "JSON (*.json)", options=options)
-            if file_name:
-                if not file_name.endswith('.json'):
-                    file_name += '.json'
-                self.df.to_json(file_name, orient='records', lines=False)
-                
-        elif file_type == "XML":
-            file_name, _ = QFileDialog.getSaveFileName(self, "Salvar Arquivo", "", "XML (*.xml)", options=options)
-            if file_name:
-                if not file_name.endswith('.xml'):
-                    file_name += '.xml'
-                    
-                # Convert DataFrame to XML
-                root = ET.Element('root')
-                for _, row in self.df.iterrows():
-                    record = ET.SubElement(root, 'record')
-                    for col_name, value in row.items():
-                        child = ET.SubElement(record, str(col_name))
-                        child.text = str(value)
-                
-                tree = ET.ElementTree(root)
-                tree.write(file_name, encoding='utf-8', xml_declaration=True)
-                
-        elif file_type == "YAML":
-            file_name, _ = QFileDialog.getSaveFileName(self, "Salvar Arquivo", "", "YAML (*.yaml)", options=options)
-            if file_name:
-                if not file_name.endswith('.yaml') and not file_name.endswith('.yml'):
-                    file_name += '.yaml'
-                    
-                with open(file_name, 'w', encoding='utf-8') as f:
-                    yaml.dump(self.df.to_dict('records'), f)
-                    
-        elif file_type == "BSON" and BSON_AVAILABLE:
-            file_name, _ = QFileDialog.getSaveFileName(self, "Salvar Arquivo", "", "BSON (*.bson)", options=options)
-            if file_name:
-                if not file_name.endswith('.bson'):
-                    file_name += '.bson'
-                    
-                with open(file_name, 'wb') as f:
-                    f.write(bson.dumps(self.df.to_dict('records')))
-        # aqui
-                # Adicionar no método save_file, junto com os outros blocos condicionais de tipo de arquivo
-        elif file_type == "SQL":
-            # Dialog para selecionar o banco de dados
-            sql_dialog = QDialog(self)
-            sql_dialog.setWindowTitle("Salvar para Banco de Dados SQL")
-            sql_dialog.setMinimumWidth(400)
-            
-            layout = QVBoxLayout(sql_dialog)
-            
-            # DB Type
-            db_type_layout = QHBoxLayout()
-            db_type_label = QLabel("Tipo de banco:")
-            db_type_combo = QComboBox()
-            db_type_combo.addItems(["PostgreSQL", "MySQL/MariaDB", "SQL Server"])
-            db_type_layout.addWidget(db_type_label)
-            db_type_layout.addWidget(db_type_combo)
-            
-            # Host
-            host_layout = QHBoxLayout()
-            host_label = QLabel("Host:")
-            host_input = QLineEdit("localhost")
-            host_layout.addWidget(host_label)
-            host_layout.addWidget(host_input)
-            
-            # Credentials
-            cred_layout = QHBoxLayout()
-            user_label = QLabel("Usuário:")
-            user_input = QLineEdit()
-            pass_label = QLabel("Senha:")
-            pass_input = QLineEdit()
-            pass_input.setEchoMode(QLineEdit.Password)
-            cred_layout.addWidget(user_label)
-            cred_layout.addWidget(user_input)
-            cred_layout.addWidget(pass_label)
-            cred_layout.addWidget(pass_input)
-            
-            # Database and Table
-            db_table_layout = QHBoxLayout()
-            db_label = QLabel("Base:")
-            db_input = QLineEdit()
-            table_label = QLabel("Tabela:")
-            table_input = QLineEdit()
-            db_table_layout.addWidget(db_label)
-            db_table_layout.addWidget(db_input)
-            db_table_layout.addWidget(table_label)
-            db_table_layout.addWidget(table_input)
-            
-            # If exists behavior
-            exists_layout = QHBoxLayout()
-            exists_label = QLabel("Se tabela existir:")
-            exists_combo = QComboBox()
-            exists_combo.addItems(["replace", "append", "fail"])
-            exists_layout.addWidget(exists_label)
-            exists_layout.addWidget(exists_combo)
-            
-            # Buttons
-            buttons = QHBoxLayout()
-            ok_button = QPushButton("Salvar")
-            cancel_button = QPushButton("Cancelar")
-            buttons.addWidget(ok_button)
-            buttons.addWidget(cancel_button)
-            
-            # Add to layout
-            layout.addLayout(db_type_layout)
-            layout.addLayout(host_layout)
-            layout.addLayout(cred_layout)
-            layout.addLayout(db_table_layout)
-            layout.addLayout(exists_layout)
-            layout.addLayout(buttons)
-            
-            # Connect buttons
-            cancel_button.clicked.connect(sql_dialog.reject)
-            ok_button.clicked.connect(sql_dialog.accept)
-            
-            if sql_dialog.exec() == QDialog.Accepted:
-                try:
-                    db_type = db_type_combo.currentText()
-                    host = host_input.text()
-                    user = user_input.text()
-                    password = pass_input.text()
-                    database = db_input.text()
-                    table = table_input.text()
-                    if_exists = exists_combo.currentText()
-                    
-                    # Verificar dados
-                    if not database or not table:
-                        raise ValueError("Base de dados e tabela são obrigatórios")
-                    
-                    # Conectar ao banco conforme tipo
-                    if db_type == "PostgreSQL":
-                        if not POSTGRES_AVAILABLE:
-                            raise ImportError("Biblioteca 'psycopg2' não instalada. Use: pip install psycopg2-binary")
-                        
-                        from sqlalchemy import create_engine
-                        engine = create_engine(f"postgresql://{user}:{password}@{host}/{database}")
-                        
-                    elif db_type == "MySQL/MariaDB":
-                        if not MYSQL_AVAILABLE:
-                            raise ImportError("Biblioteca 'mysql-connector-python' não instalada. Use: pip install mysql-connector-python")
-                        
-                        from sqlalchemy import create_engine
-                        engine = create_engine(f"mysql+mysqlconnector://{user}:{password}@{host}/{database}")
-                        
-                    
-                        from sqlalchemy import create_engine
-                        engine = create_engine(f"mssql+pymssql://{user}:{password}@{host}/{database}")
-                    
-                    # Salvar dataframe para SQL
-                    self.df.to_sql(table, engine, if_exists=if_exists, index=False)
-                    
-                    self.current_file = f"SQL:{db_type}-{database}.{table}"
-                    self.current_file_type = "SQL"
-                    self.status_bar.showMessage(f"Dados salvos em {db_type}: {database}.{table}")
-                    self.setWindowTitle(f"Bananapp - Versão 1.5 - SQL:{database}.{table}")
-                    
-                except Exception as e:
-                    QMessageBox.critical(self, "Erro ao salvar", f"Erro: {str(e)}")
+            if not file_name.lower().endswith(file_format.extensions):
+                file_name += file_format.extensions[0]
+            target = file_name
+            options = {}
+            if file_format.save_options_dialog is not None:
+                columns = [self.model.headerData(column, Qt.Horizontal)
+                           for column in range(self.model.columnCount())]
+                options = file_format.save_options_dialog(self, file_name, columns)
+                if options is None:
                     return
-
-        #aqui
-                    
         else:
-            QMessageBox.warning(self, "Aviso", f"Formato {file_type} não suportado para salvar.")
-            return
+            target = self.ask_sql_target()
+            if target is None:
+                return
+            options = {}
             
-        if file_name:
-            self.current_file = file_name
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setMaximum(1000 if file_format.progress else 0)
+        self.progress_bar.setValue(0)
+        self.status_bar.showMessage("Salvando...")
+        rate_unit = "linhas" if file_type in ("SQL", "SQLite") else None
+        if isinstance(self.model, WindowedTableModel):
+            # Tabela em janela: os blocos são lidos (com as edições) dentro da tarefa;
+            # formatos sem gravação em blocos montam a tabela inteira antes de gravar
+            if not file_format.chunked_write:
+                self.status_bar.showMessage(f"Montando a tabela para salvar em {file_type}...")
+            # Gravando por cima do arquivo (ou da tabela SQLite) aberto: depois de salvar
+            # ele é reaberto, em vez de seguir com posições e edições do arquivo antigo
+            reopen = file_format.file_based and self.model.reads_from(
+                target, options.get('table') if file_format.writes_in_place else None)
+            self.run_task(file_format.write_frames, self.model.iter_frames(), self.model.columns,
+                          self.model.rowCount(), target, **options,
+                          on_finished=lambda _: self.on_file_saved(file_type, target, reopen),
+                          error_title="Erro ao salvar", rate_unit=rate_unit)
+            return
+        # Update dataframe from model to ensure all edits are saved
+        self.df = self.model.get_dataframe()
+        self.run_task(file_format.write, self.df, target, **options,
+                      on_finished=lambda _: self.on_file_saved(file_type, target),
+                      error_title="Erro ao salvar", rate_unit=rate_unit)
+        
+    def on_file_saved(self, file_type, target, reopen=False):
+        if reopen:
+            # Mesmas opções de leitura (tabela, colunas) da abertura anterior
+            self.status_bar.showMessage(f"Arquivo salvo: {os.path.basename(target)}. Reabrindo...")
+            self.progress_bar.setValue(0)
+            self.run_task(read_data_file, target, **self._load_options,
+                          on_finished=self.on_file_loaded,
+                          error_title="Erro ao reabrir arquivo")
+            return
+        if file_type == "SQL":
+            db_type, database, table = target['db_type'], target['database'], target['table']
+            self.current_file = f"SQL:{db_type}-{database}.{table}"
+            self.current_file_type = "SQL"
+            elapsed = time.perf_counter() - self._task_started
+            self.status_bar.showMessage(f"Dados salvos em {db_type}: {database}.{table} "
+                                        f"({self.model.rowCount():,} linhas em {elapsed:.1f} s)")
+            self.setWindowTitle(f"Bananapp - Versão 1.5 - SQL:{database}.{table}")
+        else:
+            self.current_file = target
             self.current_file_type = file_type
-            self.status_bar.showMessage(f"Arquivo salvo: {os.path.basename(file_name)}")
-            self.setWindowTitle(f"Bananapp - Versão 1.5 - {os.path.basename(file_name)}")
+            self.status_bar.showMessage(f"Arquivo salvo: {os.path.basename(target)}")
+            self.setWindowTitle(f"Bananapp - Versão 1.5 - {os.path.basename(target)}")
+        QTimer.singleShot(1000, lambda: self.progress_bar.setVisible(False))
+        
+    def ask_sql_target(self):
+        # Dialog para selecionar o banco de dados
+        sql_dialog = QDialog(self)
+        sql_dialog.setWindowTitle("Salvar para Banco de Dados SQL")
+        sql_dialog.setMinimumWidth(400)
+        
+        layout = QVBoxLayout(sql_dialog)
+        
+        # DB Type
+        db_type_layout = QHBoxLayout()
+        db_type_label = QLabel("Tipo de banco:")
+        db_type_combo = QComboBox()
+        db_type_combo.addItems(["PostgreSQL", "MySQL/MariaDB", "SQL Server"])
+        db_type_layout.addWidget(db_type_label)
+        db_type_layout.addWidget(db_type_combo)
+        
+        # Host
+        host_layout = QHBoxLayout()
+        host_label = QLabel("Host:")
+        host_input = QLineEdit("localhost")
+        host_layout.addWidget(host_label)
+        host_layout.addWidget(host_input)
+        
+        # Credentials
+        cred_layout = QHBoxLayout()
+        user_label = QLabel("Usuário:")
+        user_input = QLineEdit()
+        pass_label = QLabel("Senha:")
+        pass_input = QLineEdit()
+        pass_input.setEchoMode(QLineEdit.Password)
+        cred_layout.addWidget(user_label)
+        cred_layout.addWidget(user_input)
+        cred_layout.addWidget(pass_label)
+        cred_layout.addWidget(pass_input)
+        
+        # Database and Table
+        db_table_layout = QHBoxLayout()
+        db_label = QLabel("Base:")
+        db_input = QLineEdit()
+        table_label = QLabel("Tabela:")
+        table_input = QLineEdit()
+        db_table_layout.addWidget(db_label)
+        db_table_layout.addWidget(db_input)
+        db_table_layout.addWidget(table_label)
+        db_table_layout.addWidget(table_input)
+        
+        # If exists behavior
+        exists_layout = QHBoxLayout()
+        exists_label = QLabel("Se tabela existir:")
+        exists_combo = QComboBox()
+        exists_combo.addItems(["replace", "append", "fail"])
+        exists_layout.addWidget(exists_label)
+        exists_layout.addWidget(exists_combo)
+        
+        # Linhas por INSERT multi-linha (MySQL; o PostgreSQL grava com COPY)
+        batch_layout = QHBoxLayout()
+        batch_label = QLabel("Linhas por INSERT:")
+        batch_input = QSpinBox()
+        batch_input.setRange(1, 100000)
+        batch_input.setValue(SQL_INSERT_BATCH_ROWS)
+        batch_input.setToolTip("Lotes maiores gravam mais rápido, até o limite max_allowed_packet do servidor")
+        batch_layout.addWidget(batch_label)
+        batch_layout.addWidget(batch_input)
+        db_type_combo.currentTextChanged.connect(
+            lambda db_type: batch_input.setEnabled(db_type == "MySQL/MariaDB"))
+        batch_input.setEnabled(db_type_combo.currentText() == "MySQL/MariaDB")
+        
+        # Buttons
+        buttons = QHBoxLayout()
+        ok_button = QPushButton("Salvar")
+        cancel_button = QPushButton("Cancelar")
+        buttons.addWidget(ok_button)
+        buttons.addWidget(cancel_button)
+        
+        # Add to layout
+        layout.addLayout(db_type_layout)
+        layout.addLayout(host_layout)
+        layout.addLayout(cred_layout)
+        layout.addLayout(db_table_layout)
+        layout.addLayout(exists_layout)
+        layout.addLayout(batch_layout)
+        layout.addLayout(buttons)
+        
+        # Connect buttons
+        cancel_button.clicked.connect(sql_dialog.reject)
+        ok_button.clicked.connect(sql_dialog.accept)
+        
+        if sql_dialog.exec() != QDialog.Accepted:
+            return None
+            
+        target = {
+            'db_type': db_type_combo.currentText(),
+            'host': host_input.text(),
+            'user': user_input.text(),
+            'password': pass_input.text(),
+            'database': db_input.text(),
+            'table': table_input.text(),
+            'if_exists': exists_combo.currentText(),
+            'batch_rows': batch_input.value(),
+        }
+        
+        # Verificar dados
+        if not target['database'] or not target['table']:
+            QMessageBox.critical(self, "Erro ao salvar", "Erro: Base de dados e tabela são obrigatórios")
+            return None
+        return target
+        
+def report_startup(editor, with_file):
+    # Benchmark: tempo até a primeira janela e, se um arquivo foi passado, até os dados
+    window_ms = (time.perf_counter() - STARTUP_TIME) * 1000
+    print(f"Primeira janela: {window_ms:.0f} ms", flush=True)
+    if not with_file:
+        QApplication.quit()
+        return
+    
+    def wait_for_data():
+        if editor._loading:
+            QTimer.singleShot(10, wait_for_data)
+            return
+        data_ms = (time.perf_counter() - STARTUP_TIME) * 1000
+        print(f"Dados exibidos: {data_ms:.0f} ms", flush=True)
+        QApplication.quit()
+    wait_for_data()
+
 def main():
+    benchmark = "--benchmark-startup" in sys.argv[1:]
+    files = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    
     app = QApplication(sys.argv)
     # Para Windows - ID da aplicação para agrupar na barra de tarefas
     if sys.platform == "win32":
@@ -996,21 +4357,32 @@ def main():
     app_icon = QIcon(icon_path)
     app.setWindowIcon(app_icon)
     
-    # Aplicar o mesmo ícone à janela principal
-    editor = EditorUniversal()
-    editor.setWindowIcon(app_icon)
-    
     # Setup icon resources (if we had actual icon files)
     # QDir.addSearchPath("icons", ":/icons")
     
     # Set font to improve readability in dark theme
     font = QFont("Arial", 10)
     app.setFont(font)
+    # Conexões SQL mantidas abertas durante a sessão são fechadas na saída; as
+    # paradas além do limite são fechadas periodicamente, mesmo sem uso do banco
+    app.aboutToQuit.connect(close_sql_pools)
+    pool_timer = QTimer(app)
+    pool_timer.setInterval(SQL_POOL_SWEEP_MS)
+    pool_timer.timeout.connect(sweep_sql_pools)
+    pool_timer.start()
     
+    # Aplicar o mesmo ícone à janela principal
     editor = EditorUniversal()
+    editor.setWindowIcon(app_icon)
     editor.show()
     
+    # Arquivo passado na linha de comando: python bananapp1_5.py dados.csv
+    if files:
+        editor.load_file(files[0])
+    if benchmark:
+        QTimer.singleShot(0, lambda: report_startup(editor, bool(files)))
+    
     sys.exit(app.exec())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
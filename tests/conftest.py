@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Os testes importam o módulo do aplicativo direto da raiz do repositório
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
@@ -0,0 +1,32 @@
+import bananapp1_5
+from bananapp1_5 import ConnectionPool, sweep_sql_pools
+
+
+class FakeConnection:
+    # Conexão de teste: só registra rollback e close
+    def __init__(self):
+        self.closed = False
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def test_sweep_closes_idle_connections(monkeypatch):
+    monkeypatch.setattr(bananapp1_5, "connect_sql_database", lambda target: FakeConnection())
+    pool = ConnectionPool({'db_type': "PostgreSQL"}, idle_seconds=10)
+    monkeypatch.setitem(bananapp1_5.SQL_POOLS, ("teste",), pool)
+    clock = [1000.0]
+    monkeypatch.setattr(bananapp1_5.time, "monotonic", lambda: clock[0])
+    first, second = pool.acquire(), pool.acquire()
+    pool.release(first)
+    clock[0] += 5
+    pool.release(second)
+    clock[0] += 6
+    sweep_sql_pools()
+    assert first.closed and not second.closed
+    clock[0] += 5
+    sweep_sql_pools()
+    assert second.closed
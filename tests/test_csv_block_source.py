@@ -0,0 +1,63 @@
+import pandas as pd
+
+from bananapp1_5 import CsvBlockSource
+
+
+def write_csv(tmp_path, text):
+    path = tmp_path / "tabela.csv"
+    path.write_bytes(text.encode("utf-8"))
+    return str(path)
+
+
+def read_all(source):
+    return pd.concat(list(source.iter_frames()), ignore_index=True)
+
+
+def test_index_counts_rows_and_block_offsets(tmp_path):
+    text = "id,nome\n" + "".join(f"{i},n{i}\n" for i in range(10))
+    source = CsvBlockSource(write_csv(tmp_path, text), block_rows=4)
+    assert source.row_count == 10
+    assert source.block_count == 3
+    assert [source.read_block(b)["id"].tolist() for b in range(3)] == [
+        [0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+
+def test_index_skips_blank_lines_and_quoted_newlines(tmp_path):
+    text = 'id,nome\r\n1,"a\r\nb"\r\n\r\n2,c\r\n\n3,d'
+    source = CsvBlockSource(write_csv(tmp_path, text), block_rows=2)
+    assert source.row_count == 3
+    df = read_all(source)
+    assert df["id"].tolist() == [1, 2, 3]
+    assert df["nome"].tolist() == ["a\r\nb", "c", "d"]
+
+
+def test_index_small_chunks_match_single_chunk(tmp_path):
+    text = "id,nome\n" + "".join(f'{i},"x\n{i}"\n' for i in range(7))
+    source = CsvBlockSource(write_csv(tmp_path, text), block_rows=3)
+    offsets = source.offsets
+    source._build_index(chunk_size=5)
+    assert source.offsets == offsets
+    assert source.row_count == 7
+
+
+def test_missing_bool_in_later_block_stays_missing(tmp_path):
+    text = "id,n,flag\n1,1,True\n2,2,False\n10,,\n11,3,True\n"
+    df = read_all(CsvBlockSource(write_csv(tmp_path, text), block_rows=2))
+    assert df["flag"].isna().tolist() == [False, False, True, False]
+    assert df["flag"].tolist()[0] == True and df["flag"].tolist()[1] == False
+    assert df["n"].isna().tolist() == [False, False, True, False]
+    assert df["n"].iloc[3] == 3
+
+
+def test_text_column_keeps_numeric_strings(tmp_path):
+    text = "id,code\n1,abc\n2,def\n3,007\n4,\n5,7\n"
+    df = read_all(CsvBlockSource(write_csv(tmp_path, text), block_rows=2))
+    assert df["code"].tolist()[:3] == ["abc", "def", "007"]
+    assert pd.isna(df["code"].iloc[3])
+    assert df["code"].iloc[4] == "7"
+
+
+def test_block_with_other_types_is_read_as_text(tmp_path):
+    text = "id,valor\n1,2\n2,3\n3,x\n4,5\n"
+    df = read_all(CsvBlockSource(write_csv(tmp_path, text), block_rows=2))
+    assert [str(v) for v in df["valor"]] == ["2", "3", "x", "5"]
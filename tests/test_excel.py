@@ -0,0 +1,26 @@
+import openpyxl
+import pandas as pd
+from openpyxl.styles import Font
+
+import bananapp1_5
+from bananapp1_5 import read_excel_file
+
+
+def test_trailing_blank_rows_are_trimmed_across_batches(monkeypatch, tmp_path):
+    monkeypatch.setattr(bananapp1_5, "EXCEL_BATCH_ROWS", 3)
+    path = str(tmp_path / "planilha.xlsx")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["id", "nome"])
+    for i in range(4):
+        sheet.append([i, f"n{i}"])
+    sheet.append([None, None])  # linha vazia no meio: continua na tabela
+    sheet.append([9, "n9"])
+    for row in range(9, 40):
+        sheet.cell(row=row, column=1).font = Font(bold=True)  # formatada, sem dados
+    workbook.save(path)
+
+    df = read_excel_file(path, lambda done, total: None)
+    expected = pd.read_excel(path)
+    assert len(df) == len(expected) == 6
+    pd.testing.assert_frame_equal(df, expected, check_dtype=False)
@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+
+from bananapp1_5 import (FilterSyntaxError, column_condition, filter_mask, filter_query,
+                         parse_filter, tokenize_filter)
+
+
+COLUMNS = ["Nome", "Idade", "Preço Total"]
+
+
+def test_tokenize_values_and_operators():
+    assert tokenize_filter("Idade >= 3.5 and `Preço Total` = 'a b'") == [
+        ('word', 'Idade'), ('op', '>='), ('number', 3.5), ('keyword', 'and'),
+        ('column', 'Preço Total'), ('op', '=='), ('string', 'a b')]
+
+
+def test_parse_precedence():
+    assert parse_filter("a == 1 or b == 2 and not c == 3") == (
+        'or', ('cmp', 'a', '==', 1),
+        ('and', ('cmp', 'b', '==', 2), ('not', ('cmp', 'c', '==', 3))))
+    assert parse_filter("(a == 1 or b == 2) and c == null") == (
+        'and', ('or', ('cmp', 'a', '==', 1), ('cmp', 'b', '==', 2)), ('cmp', 'c', '==', None))
+
+
+@pytest.mark.parametrize("text", ["", "a ==", "(a == 1", "a == 1 b", "a == )"])
+def test_parse_errors(text):
+    with pytest.raises(FilterSyntaxError):
+        parse_filter(text)
+
+
+def test_filter_query_resolves_columns_or_falls_back_to_text():
+    assert filter_query("idade > 3", COLUMNS) == (('cmp', 1, '>', 3), None)
+    query, error = filter_query("Altura > 3", COLUMNS)
+    assert query == ('text', "Altura > 3")
+    assert "Altura" in error
+    assert filter_query("banana", COLUMNS)[0] == ('text', "banana")
+
+
+def test_column_condition_is_parenthesized():
+    assert column_condition("Idade", "> 40 or `Idade` < 10") == "(`Idade` > 40 or `Idade` < 10)"
+    assert column_condition("Idade", "> 40") == "(`Idade` > 40)"
+    assert column_condition("Nome", "ana") == '`Nome` ~ "ana"'
+    combined = " and ".join([column_condition("Nome", "== 'Bia' or `Nome` == 'Ana'"),
+                             column_condition("Idade", "> 40")])
+    query, error = filter_query(combined, COLUMNS)
+    assert error is None
+    assert query[0] == 'and' and query[1][0] == 'or'
+
+
+def test_column_condition_rejects_other_columns():
+    assert column_condition("Nome", "~ a and Idade > 3") == '`Nome` ~ "~ a and Idade > 3"'
+    assert column_condition("Nome", '~ a or "x"') == '`Nome` ~ "~ a or \\"x\\""'
+    assert column_condition("Nome", "~ a or `nome` ~ b") == "(`Nome` ~ a or `nome` ~ b)"
+
+
+def test_filter_mask_follows_the_tree():
+    df = pd.DataFrame({"Nome": ["Ana", "Bia", None], "Idade": [30, 45, 12]})
+
+    def text(col):
+        return df.iloc[:, col].astype(str).str.lower()
+
+    def mask(expression):
+        query, error = filter_query(expression, list(df.columns))
+        assert error is None
+        return filter_mask(query, df, text, None).tolist()
+
+    assert mask("Idade > 20 and not Nome ~ bi") == [True, False, False]
+    assert mask("Nome == null or Idade == 45") == [False, True, True]
+    assert mask("Nome != 'ana'") == [False, True, True]
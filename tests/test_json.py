@@ -0,0 +1,45 @@
+import io
+import json
+
+import pytest
+
+from bananapp1_5 import iter_json_array
+
+
+DOCUMENTS = [
+    '[-3.5e10]',
+    '[1, 3e5]',
+    '[ {"a": 1.25, "b": [true, null, "x,]"]} , {"a": -0.5E-3, "b": []}, 12, "s" ]',
+    '[\n  1234567890,\n  false,\n  null\n]\n',
+    '[]',
+]
+
+
+@pytest.mark.parametrize("text", DOCUMENTS)
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4, 5, 6, 7, 64])
+def test_items_match_json_loads_for_any_chunk_size(text, chunk_size):
+    items = list(iter_json_array(io.StringIO(text), chunk_size=chunk_size))
+    assert items == json.loads(text)
+
+
+def test_rejects_non_array():
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO('{"a": 1}')))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64])
+def test_rejects_truncated_array(chunk_size):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO('[1, 2.5'), chunk_size=chunk_size))
+
+
+def test_jsonl_writes_dates_as_iso_text(tmp_path):
+    import pandas as pd
+    from bananapp1_5 import read_jsonl_file, write_jsonl_file
+
+    path = str(tmp_path / "dados.jsonl")
+    df = pd.DataFrame({"id": [1, 2], "quando": pd.to_datetime(["2020-01-01", None])})
+    write_jsonl_file(df, path, lambda done, total: None)
+    result = read_jsonl_file(path, lambda done, total: None)
+    assert result["quando"].iloc[0].startswith("2020-01-01T00:00:00")
+    assert pd.isna(result["quando"].iloc[1])
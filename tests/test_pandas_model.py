@@ -0,0 +1,53 @@
+import tracemalloc
+
+import pandas as pd
+
+import bananapp1_5
+from bananapp1_5 import PandasModel
+
+
+def cell(model, row, col):
+    return model.data(model.index(row, col))
+
+
+def test_cells_are_formatted_by_block_and_cached(monkeypatch):
+    monkeypatch.setattr(bananapp1_5, "DISPLAY_BLOCK_ROWS", 4)
+    monkeypatch.setattr(bananapp1_5, "DISPLAY_CACHE_BLOCKS", 2)
+    model = PandasModel(pd.DataFrame({"n": range(20), "x": [1.5] * 20}))
+    assert cell(model, 5, 0) == "5"
+    assert cell(model, 6, 1) == "1.5"
+    assert list(model._display_cache) == [(0, 1), (1, 1)]
+    cell(model, 10, 0)
+    assert list(model._display_cache) == [(1, 1), (0, 2)]
+
+
+def test_edit_updates_only_the_cached_cell(monkeypatch):
+    monkeypatch.setattr(bananapp1_5, "DISPLAY_BLOCK_ROWS", 4)
+    model = PandasModel(pd.DataFrame({"n": range(8), "s": list("abcdefgh")}))
+    assert [cell(model, row, 1) for row in range(4)] == ["a", "b", "c", "d"]
+    assert model.setData(model.index(2, 1), "zz")
+    assert model.setData(model.index(3, 0), "7")
+    assert [cell(model, row, 1) for row in range(4)] == ["a", "b", "zz", "d"]
+    assert cell(model, 3, 0) == "7"
+    assert model.get_dataframe()["n"].iloc[3] == 7
+
+
+def test_appended_rows_are_displayed(monkeypatch):
+    monkeypatch.setattr(bananapp1_5, "DISPLAY_BLOCK_ROWS", 4)
+    model = PandasModel(pd.DataFrame({"n": [1, 2]}))
+    assert cell(model, 1, 0) == "2"
+    model.append_rows(pd.DataFrame({"n": [3, 4, 5]}))
+    assert [cell(model, row, 0) for row in range(5)] == ["1", "2", "3", "4", "5"]
+
+
+def test_long_cell_does_not_widen_the_block():
+    # Array de largura fixa seria 256 x 100000 x 4 bytes (~100 MB)
+    model = PandasModel(pd.DataFrame({"s": ["a"] * 255 + ["x" * 100000]}))
+    tracemalloc.start()
+    try:
+        assert cell(model, 0, 0) == "a"
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < 10 * 1024 * 1024
+    assert cell(model, 255, 0) == "x" * 100000
@@ -0,0 +1,84 @@
+import sqlite3
+
+import pytest
+
+from bananapp1_5 import RemoteSQLTableSource
+
+
+class SQLiteStandIn(RemoteSQLTableSource):
+    # Dialeto MySQL executado num SQLite em memória (aceita crases e row values);
+    # só o marcador %s vira ?
+    def __init__(self, conn, **kwargs):
+        target = {'db_type': "MySQL/MariaDB", 'table': "pessoas"}
+        columns = [row[0] for row in conn.execute("SELECT * FROM pessoas LIMIT 0").description]
+        super().__init__(target, columns, ["id"], 10, **kwargs)
+        self.conn = conn
+        self.queries = []
+
+    def _fetch(self, query, params):
+        self.queries.append(query)
+        return self.conn.execute(query.replace("%s", "?"), params).fetchall()
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE pessoas (id INTEGER PRIMARY KEY, nome TEXT, idade INTEGER)")
+    conn.executemany("INSERT INTO pessoas VALUES (?, ?, ?)",
+                     [(i, f"Nome{i}_x" if i % 3 else f"Outro{i}", 20 + i) for i in range(1, 11)])
+    return conn
+
+
+def read_all(source):
+    frames = []
+    block = 0
+    while True:
+        df = source.read_block(block)
+        frames.append(df)
+        if len(df) < source.block_rows:
+            break
+        block += 1
+    return [row for df in frames for row in df["id"].tolist()]
+
+
+def test_filter_is_pushed_into_where(conn):
+    source = SQLiteStandIn(conn, block_rows=2)
+    source.set_filter("idade > 24 and not nome ~ outro")
+    assert source.row_count is None
+    assert read_all(source) == [5, 7, 8, 10]
+    assert all("WHERE" in query for query in source.queries)
+
+
+def test_like_pattern_escapes_wildcards(conn):
+    # O escape padrão do LIKE é \ no MySQL e no PostgreSQL (o SQLite não tem padrão)
+    source = SQLiteStandIn(conn)
+    source.set_filter('nome ~ "1_x%"')
+    assert source._params == ("%1\\_x\\%%",)
+
+
+def test_free_text_searches_every_column(conn):
+    source = SQLiteStandIn(conn)
+    source.set_filter("outro")
+    assert read_all(source) == [3, 6, 9]
+
+
+def test_sort_pages_by_offset(conn):
+    source = SQLiteStandIn(conn, block_rows=3)
+    source.set_sort(2, descending=True)
+    assert read_all(source) == [10, 9, 8, 7, 6, 5, 4, 3, 2, 1]
+    assert "ORDER BY `idade` DESC, `id`" in source.queries[0]
+
+
+def test_save_ignores_view_filter(conn):
+    source = SQLiteStandIn(conn, block_rows=4)
+    source.set_filter("idade < 22")
+    frames = list(source.iter_frames())
+    assert sum(len(df) for df in frames) == 10
+
+
+def test_postgres_conditions_cast_and_pass_text():
+    target = {'db_type': "PostgreSQL", 'table': "pessoas"}
+    source = RemoteSQLTableSource(target, ["id", "nome"], ["id"], 10)
+    source.set_filter("id == 5 or nome ~ ana")
+    assert source._where == '("id" = %s OR CAST("nome" AS TEXT) ILIKE %s)'
+    assert source._params == ("5", "%ana%")
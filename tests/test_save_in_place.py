@@ -0,0 +1,86 @@
+import sqlite3
+import time
+
+import pandas as pd
+import pytest
+from PySide6.QtWidgets import QApplication
+
+import bananapp1_5
+from bananapp1_5 import EditorUniversal, WindowedTableModel
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def wait_until(app, condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "tempo esgotado"
+        app.processEvents()
+        time.sleep(0.002)
+
+
+def cell(model, row, col):
+    return model.data(model.index(row, col))
+
+
+def open_windowed(app, monkeypatch, path):
+    monkeypatch.setattr(bananapp1_5, "LARGE_FILE_THRESHOLD", 0)
+    monkeypatch.setattr(bananapp1_5.QFileDialog, "getSaveFileName",
+                        staticmethod(lambda *args, **kwargs: (path, "")))
+    editor = EditorUniversal()
+    editor.load_file(path)
+    wait_until(app, lambda: isinstance(editor.model, WindowedTableModel) and not editor._loading)
+    return editor
+
+
+def save_and_wait(app, editor):
+    before = editor.model
+    editor.save_file()
+    wait_until(app, lambda: editor.model is not before and not editor._loading)
+    return editor.model
+
+
+def test_saving_windowed_csv_over_itself_reopens_it(app, monkeypatch, tmp_path):
+    path = str(tmp_path / "tabela.csv")
+    rows = 10000
+    pd.DataFrame({"id": range(rows), "nome": [f"n{i}" for i in range(rows)]}).to_csv(path, index=False)
+    editor = open_windowed(app, monkeypatch, path)
+    model = editor.model
+    wait_until(app, lambda: cell(model, 0, 1) == "n0")
+    assert model.setData(model.index(0, 1), "um nome bem mais longo que o original")
+    model = save_and_wait(app, editor)
+    wait_until(app, lambda: cell(model, 9000, 0) == "9000")
+    assert cell(model, 9000, 1) == "n9000"
+    assert not model._edits
+    saved = pd.read_csv(path)
+    assert saved["nome"].iloc[0] == "um nome bem mais longo que o original"
+    assert saved["id"].tolist() == list(range(rows))
+    editor.close()
+
+
+def test_saving_sqlite_table_over_itself_reopens_it(app, monkeypatch, tmp_path):
+    path = str(tmp_path / "banco.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE data (id INTEGER, nome TEXT)")
+    conn.executemany("INSERT INTO data VALUES (?, ?)", [(i, f"n{i}") for i in range(10)])
+    conn.execute("DELETE FROM data WHERE id < 5")  # rowids com buraco: 6..10
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(bananapp1_5.FILE_FORMATS["SQLite"], "save_options_dialog",
+                        lambda parent, file_name, columns: {'table': "data", 'index_column': None})
+    editor = EditorUniversal()
+    monkeypatch.setattr(bananapp1_5.QFileDialog, "getSaveFileName",
+                        staticmethod(lambda *args, **kwargs: (path, "")))
+    editor.load_file(path)
+    wait_until(app, lambda: isinstance(editor.model, WindowedTableModel) and not editor._loading)
+    model = editor.model
+    wait_until(app, lambda: cell(model, 0, 1) == "n5")
+    model.setData(model.index(1, 1), "editado")
+    model = save_and_wait(app, editor)
+    assert not model._edits
+    wait_until(app, lambda: cell(model, 1, 1) == "editado")
+    assert [cell(model, row, 1) for row in range(5)] == ["n5", "editado", "n7", "n8", "n9"]
+    editor.close()
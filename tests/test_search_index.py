@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from bananapp1_5 import INDEX_MAX_LENGTH, TrigramIndex
+
+
+def build(values):
+    text = pd.Series(values, dtype=object).str.lower()
+    return TrigramIndex.build({0: text}, len(text), lambda done, total: None), text
+
+
+def matches(text, needle):
+    return set(np.flatnonzero(text.str.contains(needle, regex=False).to_numpy()).tolist())
+
+
+def test_lookup_returns_every_matching_row():
+    values = [f"cliente {i:03d}" for i in range(200)]
+    values[17] = "brasília"
+    values[150] = "são paulo, brasil"
+    index, text = build(values)
+    for needle in ("bras", "paulo", "ente 04", "zzz"):
+        rows = index.lookup(0, needle)
+        assert rows is not None
+        assert matches(text, needle) <= set(rows.tolist())
+    assert set(index.lookup(0, "bras").tolist()) == {17, 150}
+
+
+def test_short_and_unselective_queries_fall_back_to_scan():
+    index, _ = build([f"cliente {i}" for i in range(100)])
+    assert index.lookup(0, "cl") is None
+    assert index.lookup(0, "cliente") is None
+    assert index.lookup(1, "cliente") is None
+
+
+def test_long_cells_are_always_candidates():
+    values = [f"valor {i}" for i in range(100)]
+    values[5] = "x" * (INDEX_MAX_LENGTH + 1) + "agulha"
+    index, text = build(values)
+    assert 5 in index.lookup(0, "agulha").tolist()
+    assert 5 in index.lookup(0, "qqq").tolist()
+
+
+def test_save_and_load_check_the_signature(tmp_path):
+    index, _ = build([f"linha {i}" for i in range(50)] + ["banana"])
+    path = str(tmp_path / "dados.bananaidx")
+    index.save(path, "assinatura")
+    assert TrigramIndex.load(path, "outra") is None
+    loaded = TrigramIndex.load(path, "assinatura")
+    assert loaded.row_count == 51
+    assert loaded.lookup(0, "banana").tolist() == [50]
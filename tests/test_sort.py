@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+
+from bananapp1_5 import stable_order
+
+
+def test_numbers_sort_by_value_and_ties_keep_order():
+    frame = pd.DataFrame({"n": [10, 9, 10, 1]})
+    assert stable_order(frame, [True]).tolist() == [3, 1, 0, 2]
+    assert stable_order(frame, [False]).tolist() == [0, 2, 1, 3]
+
+
+def test_missing_values_go_last_in_both_directions():
+    for values in ([2.0, np.nan, 1.0], pd.array([2, None, 1], dtype="Int64"),
+                   pd.array([True, None, False], dtype="boolean")):
+        frame = pd.DataFrame({"v": values})
+        assert stable_order(frame, [True]).tolist() == [2, 0, 1]
+        assert stable_order(frame, [False]).tolist() == [0, 2, 1]
+
+
+def test_multiple_columns_with_mixed_directions():
+    frame = pd.DataFrame({"a": ["x", "y", "x", "y"], "b": [1, 2, 3, 4]})
+    assert stable_order(frame, [True, False]).tolist() == [2, 0, 3, 1]
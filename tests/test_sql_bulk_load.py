@@ -0,0 +1,36 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from bananapp1_5 import copy_csv_text, insert_multirow
+
+
+def test_insert_multirow_against_sqlite_stand_in():
+    rows = 2503
+    df = pd.DataFrame({
+        "id": np.arange(rows),
+        "valor": np.where(np.arange(rows) % 7 == 0, np.nan, np.arange(rows) / 2),
+        "nome": [None if i % 5 == 0 else f"n{i}" for i in range(rows)],
+    })
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (id INTEGER, valor REAL, nome TEXT)")
+    calls = []
+    conn.set_trace_callback(calls.append)
+    progress = []
+    insert_multirow(conn, df, "t", lambda done, total: progress.append((done, total)),
+                    placeholder="?", batch_rows=100)
+    conn.set_trace_callback(None)
+    assert sum(call.startswith("INSERT") for call in calls) == 26
+    assert progress[-1] == (rows, rows)
+    result = pd.read_sql("SELECT * FROM t ORDER BY id", conn)
+    assert len(result) == rows
+    assert result["valor"].isna().sum() == df["valor"].isna().sum()
+    assert result["nome"].isna().sum() == df["nome"].isna().sum()
+    pd.testing.assert_frame_equal(result, df, check_dtype=False)
+
+
+def test_copy_csv_keeps_nulls_apart_from_text():
+    df = pd.DataFrame({"a": ["x", "\\N", None, "", 'di"z'], "b": [1.5, np.nan, 2.0, 3.0, 4.0]})
+    assert copy_csv_text(df).splitlines() == [
+        '"x","1.5"', '"\\N",', ',"2.0"', '"","3.0"', '"di""z","4.0"']
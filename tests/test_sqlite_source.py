@@ -0,0 +1,47 @@
+import sqlite3
+
+import pytest
+
+from bananapp1_5 import SQLiteTableSource
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / "banco.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (id INTEGER, nome TEXT, apelido TEXT)")
+    conn.execute("CREATE INDEX i_nome ON t (nome)")
+    conn.execute("CREATE INDEX i_apelido ON t (apelido COLLATE NOCASE)")
+    conn.executemany("INSERT INTO t VALUES (?, ?, ?)",
+                     [(1, "Ana", "ana"), (2, "Bia", "BIA"), (3, None, None)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def query_plan(source, text):
+    source.set_filter(text)
+    conn = source._connection()
+    rows = conn.execute(f"EXPLAIN QUERY PLAN SELECT * FROM t WHERE {source._where}", source._params)
+    return " ".join(row[-1] for row in rows)
+
+
+def test_text_equality_uses_binary_index(database):
+    source = SQLiteTableSource(database, "t")
+    assert "USING INDEX i_nome" in query_plan(source, "nome == 'Ana'")
+
+
+def test_text_equality_on_nocase_index_ignores_case(database):
+    source = SQLiteTableSource(database, "t")
+    assert "USING INDEX i_apelido" in query_plan(source, "apelido == 'bia'")
+    assert source.read_block(0)["id"].tolist() == [2]
+
+
+def test_text_search_and_null_comparisons(database):
+    source = SQLiteTableSource(database, "t")
+    source.set_filter("nome != 'Ana'")
+    assert source.read_block(0)["id"].tolist() == [2, 3]
+    source.set_filter("bi")
+    assert source.read_block(0)["id"].tolist() == [2]
+    source.set_filter("nome == null")
+    assert source.read_block(0)["id"].tolist() == [3]
@@ -0,0 +1,68 @@
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+from PySide6.QtCore import QCoreApplication
+
+from bananapp1_5 import FilterEngine, PandasModel, text_column
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def displayed(model, col):
+    return [model.data(model.index(row, col)) for row in range(model.rowCount())]
+
+
+def test_text_matches_the_displayed_cells():
+    df = pd.DataFrame({
+        "quando": pd.to_datetime(["2020-01-01", None]),
+        "valor": [1.5, np.nan],
+        "qtd": pd.array([3, None], dtype="Int64"),
+        "nome": ["Ana", None],
+    })
+    model = PandasModel(df)
+    for col in range(len(df.columns)):
+        expected = [text.lower() for text in displayed(model, col)]
+        assert text_column(df.iloc[:, col]).tolist() == expected
+    assert text_column(df["quando"]).iloc[0] == "2020-01-01 00:00:00"
+
+
+def run_filter(app, engine, text):
+    results = []
+    engine.filtered.connect(lambda mask, query: results.append((mask, query)))
+    engine.request(text)
+    deadline = time.monotonic() + 5
+    while not any(query == text for _, query in results):
+        assert time.monotonic() < deadline
+        app.processEvents()
+        time.sleep(0.001)
+    return [mask for mask, query in results if query == text][-1].tolist()
+
+
+def test_filter_finds_time_shown_in_grid_and_follows_edits(app):
+    df = pd.DataFrame({"quando": pd.to_datetime(["2020-01-01 00:00", "2020-01-02 10:30"]),
+                       "nome": ["Ana", "Bia"]})
+    model = PandasModel(df)
+    engine = FilterEngine(model)
+    assert run_filter(app, engine, "00:00") == [True, False]
+    model.setData(model.index(1, 1), "Carla")
+    assert run_filter(app, engine, "carla") == [False, True]
+    engine.close()
+
+
+def test_long_cell_does_not_widen_the_whole_chunk():
+    # Array de largura fixa seria 1001 x 20000 x 4 bytes (80 MB)
+    column = pd.Series(["a"] * 1000 + ["x" * 20000], dtype=object)
+    tracemalloc.start()
+    try:
+        text = text_column(column)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < 10 * 1024 * 1024
+    assert text.iloc[-1] == "x" * 20000 and text.iloc[0] == "a"
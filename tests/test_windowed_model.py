@@ -0,0 +1,71 @@
+import sqlite3
+import time
+
+import pytest
+from PySide6.QtCore import QCoreApplication
+
+from bananapp1_5 import CsvBlockSource, SQLiteTableSource, WindowedTableModel
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def wait_until(app, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "tempo esgotado esperando a leitura do bloco"
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def cell(model, row, col):
+    return model.data(model.index(row, col))
+
+
+def test_blocks_are_read_in_the_background(app, tmp_path):
+    path = tmp_path / "tabela.csv"
+    path.write_text("id,nome\n" + "".join(f"{i},n{i}\n" for i in range(25)))
+    model = WindowedTableModel(CsvBlockSource(str(path), block_rows=10))
+    assert model.rowCount() == 25
+    assert cell(model, 21, 1) == ""  # ainda não lido: a vista não espera o disco
+    changed = []
+    model.dataChanged.connect(lambda top, bottom: changed.append((top.row(), bottom.row())))
+    wait_until(app, lambda: cell(model, 21, 1) == "n21")
+    assert (20, 24) in changed
+
+
+def test_sqlite_filter_grows_rows_as_pages_arrive(app, tmp_path):
+    path = str(tmp_path / "banco.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (id INTEGER, nome TEXT)")
+    conn.executemany("INSERT INTO t VALUES (?, ?)", [(i, "par" if i % 2 == 0 else "impar") for i in range(50)])
+    conn.commit()
+    conn.close()
+    model = WindowedTableModel(SQLiteTableSource(path, "t", block_rows=10))
+    model.set_filter_text("nome == 'par'")
+    assert model.rowCount() == 0
+    while model.canFetchMore():
+        rows = model.rowCount()
+        model.fetchMore()
+        wait_until(app, lambda: model.rowCount() > rows or not model.canFetchMore())
+    assert model.rowCount() == 25
+    wait_until(app, lambda: cell(model, 24, 0) == "48")
+
+
+def test_loaded_blocks_are_not_edits_for_the_filter(app, tmp_path):
+    from bananapp1_5 import FilterEngine
+
+    path = tmp_path / "tabela.csv"
+    path.write_text("id,nome\n" + "".join(f"{i},n{i}\n" for i in range(25)))
+    model = WindowedTableModel(CsvBlockSource(str(path), block_rows=10))
+    engine = FilterEngine(model)
+    engine.filtered.connect(lambda mask, text: None)
+    cell(model, 0, 0)
+    cell(model, 15, 0)
+    wait_until(app, lambda: cell(model, 15, 0) == "15" and cell(model, 0, 0) == "0")
+    assert engine._generation == 0 and not engine._dirty
+    model.setData(model.index(3, 1), "novo")
+    assert engine._generation == 1 and engine._dirty == {1: {3}}
+    engine.close()
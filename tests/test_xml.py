@@ -0,0 +1,28 @@
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pandas as pd
+
+from bananapp1_5 import write_xml_file
+
+
+def test_xml_round_trip_text(tmp_path):
+    path = str(tmp_path / "dados.xml")
+    df = pd.DataFrame({"nome": ["a<b", "c&d", np.nan], "n": [1.5, np.nan, 3.0]})
+    write_xml_file(df, path, lambda done, total: None)
+    records = [{child.tag: child.text for child in record} for record in ET.parse(path).getroot()]
+    assert records == [{"nome": "a<b", "n": "1.5"}, {"nome": "c&d", "n": "nan"},
+                       {"nome": "nan", "n": "3.0"}]
+
+
+def test_long_cell_does_not_widen_the_batch(tmp_path):
+    # Array de largura fixa seria 10000 x 20000 x 4 bytes (800 MB)
+    df = pd.DataFrame({"s": ["a"] * 9999 + ["x" * 20000]})
+    tracemalloc.start()
+    try:
+        write_xml_file(df, str(tmp_path / "dados.xml"), lambda done, total: None)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < 50 * 1024 * 1024
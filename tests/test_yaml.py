@@ -0,0 +1,38 @@
+import io
+
+import yaml
+
+import bananapp1_5
+from bananapp1_5 import iter_yaml_chunks, yaml_records
+
+
+def load_chunks(text):
+    return [yaml.safe_load(chunk) for chunk in iter_yaml_chunks(io.StringIO(text))]
+
+
+def test_block_list_is_split_in_batches(monkeypatch):
+    monkeypatch.setattr(bananapp1_5, "YAML_BATCH_ROWS", 2)
+    text = "# cabeçalho\n" + "".join(f"- id: {i}\n  nome: n{i}\n" for i in range(5))
+    chunks = load_chunks(text)
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert [row for rows in yaml_records(chunks) for row in rows] == yaml.safe_load(text)
+
+
+def test_each_document_is_its_own_chunk(monkeypatch):
+    monkeypatch.setattr(bananapp1_5, "YAML_BATCH_ROWS", 2)
+    text = "---\n- a: 1\n- a: 2\n- a: 3\n---\nb: 4\n...\n--- \n- c: 5\n"
+    chunks = load_chunks(text)
+    records = [row for rows in yaml_records(chunks) for row in rows]
+    expected = [row for rows in yaml_records(yaml.safe_load_all(text)) for row in rows]
+    assert records == expected == [{'a': 1}, {'a': 2}, {'a': 3}, {'b': 4}, {'c': 5}]
+
+
+def test_nested_lists_are_not_split(monkeypatch):
+    monkeypatch.setattr(bananapp1_5, "YAML_BATCH_ROWS", 1)
+    text = "- id: 1\n  tags:\n  - a\n  - b\n- id: 2\n  tags: []\n"
+    assert load_chunks(text) == [[{'id': 1, 'tags': ['a', 'b']}], [{'id': 2, 'tags': []}]]
+
+
+def test_empty_stream_has_no_chunks():
+    assert load_chunks("") == []
+    assert load_chunks("# só comentário\n") == []